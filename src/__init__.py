@@ -21,15 +21,72 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
-from .board import Board, DisplayError, Error
+from importlib import import_module
+from typing import Any, List
+
+from .board import Board
 from .colors import Color
+from .correction import Correction
+from .errors import (
+    BackendError, DaemonError, DisplayError, Error, RecordingError,
+    SharedStateError)
+from .frame import Frame
+from .group import BoardGroup
+from .recording import Player, Recorder
+from .stats import Stats
+from .timing import BusyWait, Calibrated, NoDelay, Sleep, Timing
+from .transport import Transport
+
+# Backends and the daemon are imported the first time they are accessed, so
+# importing the package does not import them
+_LAZY = {
+    'Server': '.daemon',
+    'Client': '.daemon',
+    'GPIOTransport': '.gpio',
+    'SPITransport': '.spi',
+    'EmulatorTransport': '.emulator',
+    'EmulatedGPIO': '.emulator',
+}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module = _LAZY[name]
+    except KeyError:
+        raise AttributeError("module {!r} has no attribute {!r}".format(
+            __name__, name)) from None
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY))
 
 
 __all__ = (
     # Classes
     Board,
+    BoardGroup,
     Color,
+    Correction,
+    Frame,
+    Recorder,
+    Player,
+    Stats,
+    # Transports
+    Transport,
+    # Timing strategies
+    Timing,
+    NoDelay,
+    Sleep,
+    BusyWait,
+    Calibrated,
     # Exceptions
     Error,
     DisplayError,
+    RecordingError,
+    DaemonError,
+    BackendError,
+    SharedStateError,
 )
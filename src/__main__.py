@@ -0,0 +1,80 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import argparse
+import signal
+import sys
+from typing import Optional, Sequence
+
+from . import backends
+from .board import Board
+from .daemon import FPS, OPC_PORT, SOCKET_PATH, Server
+from .leds import NUM_LEDS
+
+
+def _terminate(signum: int, frame) -> None:
+    sys.exit(0)
+
+
+def serve(args: argparse.Namespace) -> None:
+    board = Board()
+    board.num_leds = args.leds
+    board.backend = args.backend
+    board.clear = args.clear
+    server = Server(board, args.socket, args.opc, args.fps)
+    signal.signal(signal.SIGTERM, _terminate)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: Optional[Sequence[str]]=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m blinkt")
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+    parser_serve = commands.add_parser(
+        'serve', help="own the board and display updates sent by clients")
+    parser_serve.add_argument('--socket', default=SOCKET_PATH,
+                              help="Unix socket path (default: %(default)s)")
+    parser_serve.add_argument('--opc', type=int, nargs='?', const=OPC_PORT,
+                              help="also listen for Open Pixel Control "
+                                   "clients on a TCP port (default: "
+                                   "{})".format(OPC_PORT))
+    parser_serve.add_argument('--fps', type=float, default=FPS,
+                              help="maximum frame rate (default: %(default)s)")
+    parser_serve.add_argument('--leds', type=int, default=NUM_LEDS,
+                              help="number of leds (default: %(default)s)")
+    parser_serve.add_argument('--backend', choices=backends.names(),
+                              help="backend (default: ${} or {})".format(
+                                  backends.ENVIRONMENT_VARIABLE,
+                                  backends.DEFAULT_BACKEND))
+    parser_serve.add_argument('--clear', action='store_true',
+                              help="shut off the leds on exit")
+    parser_serve.set_defaults(run=serve)
+    args = parser.parse_args(argv)
+    args.run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import os
+from importlib import import_module
+from typing import Dict, Optional, Tuple, Type, TYPE_CHECKING
+
+from .errors import BackendError
+from .leds import NUM_LEDS
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .transport import Transport
+
+ENVIRONMENT_VARIABLE = 'BLINKT_BACKEND'
+DEFAULT_BACKEND = 'gpio'
+
+# Transport class of every backend as "module:class", imported when needed
+_registry = {
+    'gpio': '.gpio:GPIOTransport',
+    'spi': '.spi:SPITransport',
+    'emulator': '.emulator:EmulatorTransport',
+}  # type: Dict[str, str]
+
+
+def register(name: str, target: str) -> None:
+    """
+    Make the transport class at `target` ("module:class") available as the
+    backend `name`. The module is not imported until the backend is loaded.
+    """
+    module, _, attribute = target.partition(':')
+    if not module or not attribute:
+        raise ValueError("Expected 'module:class', got {!r}".format(target))
+    _registry[name] = target
+
+
+def names() -> Tuple[str, ...]:
+    """Names of the registered backends"""
+    return tuple(_registry)
+
+
+def selected(name: Optional[str]=None) -> str:
+    """`name` if provided, else the environment variable, else the default"""
+    if name is None:
+        name = os.environ.get(ENVIRONMENT_VARIABLE) or DEFAULT_BACKEND
+    return name
+
+
+def load(name: Optional[str]=None) -> Type["Transport"]:
+    """Import the transport class of a backend (see `selected`)"""
+    name = selected(name)
+    try:
+        target = _registry[name]
+    except KeyError:
+        raise BackendError("Unknown backend {!r}, expected one of: {}".format(
+            name, ", ".join(_registry))) from None
+    module, _, attribute = target.partition(':')
+    return getattr(import_module(module, __package__), attribute)
+
+
+def create(name: Optional[str]=None, num_leds: int=NUM_LEDS) -> "Transport":
+    """Transport of a backend (see `selected`) for a chain of `num_leds`"""
+    return load(name).create(num_leds)
@@ -0,0 +1,396 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from threading import Barrier, Thread
+from time import perf_counter, sleep, time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .board import Board
+from .colors import Color, hue_wheel
+from .daemon import Client, FPS, Server
+from .emulator import EmulatorTransport
+from .encoder import Encoder
+from .gpio import GPIOTransport
+from .leds import Array, NUM_LEDS
+from .spi import SPI_SPEED, SPITransport
+from .stats import Stats
+from .timing import NoDelay
+from .transport import Transport
+
+CHAIN_SIZES = (8, 144, 1024, 4096)
+THREADS = (1, 2, 4, 8)
+REPEAT = 200
+OPERATIONS = 10000
+IMPORT_REPEAT = 10
+# Modules that importing the package must not import
+HARDWARE_MODULES = ('RPi', 'spidev', 'numpy')
+
+_IMPORT_SCRIPT = """
+import json, sys
+from time import perf_counter
+before = set(sys.modules)
+start = perf_counter()
+import {package}
+elapsed = perf_counter() - start
+print(json.dumps([elapsed, sorted(set(sys.modules) - before)]))
+"""
+
+
+class StubGPIO:
+    """`RPi.GPIO` replacement that does nothing, to measure the Python cost"""
+
+    BOARD = 10
+    OUT = 0
+
+    def setmode(self, mode: int) -> None:
+        pass
+
+    def setwarnings(self, flag: bool) -> None:
+        pass
+
+    def setup(self, channel: int, direction: int) -> None:
+        pass
+
+    def output(self, channel: int, value: bool) -> None:
+        pass
+
+    def cleanup(self, channels=None) -> None:
+        pass
+
+
+def measure(fn: Callable[[], Any], repeat: int=REPEAT) -> Dict[str, float]:
+    """Best and mean time of a call to `fn`, in microseconds"""
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        fn()
+        times.append(perf_counter() - start)
+    return {
+        'best_us': min(times) * 1e6,
+        'mean_us': sum(times) / len(times) * 1e6,
+    }
+
+
+def rate(fn: Callable[[], Any], number: int=OPERATIONS) -> float:
+    """Calls to `fn` per second"""
+    start = perf_counter()
+    for _ in range(number):
+        fn()
+    return number / (perf_counter() - start)
+
+
+def setters(number: int=OPERATIONS) -> Dict[str, float]:
+    """Single led and bulk color and brightness sets per second"""
+    array = Array(NUM_LEDS)
+    led = array[0]
+    color = Color(10, 20, 30)
+    colors = hue_wheel(NUM_LEDS)
+    brightness = [i / NUM_LEDS for i in range(NUM_LEDS)]
+
+    def led_color() -> None:
+        led.color = color
+
+    def led_brightness() -> None:
+        led.brightness = 0.5
+
+    def bulk_color() -> None:
+        array.color = colors
+
+    def bulk_brightness() -> None:
+        array.brightness = brightness
+
+    def owned_color() -> None:
+        with led:
+            led.color = color
+
+    return {
+        'led_color_per_s': rate(led_color, number),
+        'led_brightness_per_s': rate(led_brightness, number),
+        'led_owned_color_per_s': rate(owned_color, number),
+        'bulk_color_per_s': rate(bulk_color, number),
+        'bulk_brightness_per_s': rate(bulk_brightness, number),
+    }
+
+
+def colors(number: int=OPERATIONS) -> Dict[str, float]:
+    """Color construction rate, one by one and in batches"""
+    hues = [i / number for i in range(number)]
+    start = perf_counter()
+    for hue in hues:
+        Color.hsv(hue, 1.0, 1.0)
+    single = number / (perf_counter() - start)
+    start = perf_counter()
+    Color.hsv_many(hues, 1.0, 1.0)
+    batch = number / (perf_counter() - start)
+    return {
+        'hsv_per_s': single,
+        'hsv_many_per_s': batch,
+    }
+
+
+def chain(
+        sizes: Sequence[int]=CHAIN_SIZES,
+        repeat: int=REPEAT,
+) -> List[Dict[str, Any]]:
+    """
+    Frame encode and transmit time for several chain lengths
+
+    Frames are transmitted through an `SPITransport` writing to a temporary
+    file, so the transmit time is the Python and system call overhead. The
+    time the frame would need on the bus at the default SPI clock rate is
+    reported as `bus_us`.
+    """
+    results = []
+    encoder = Encoder()
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            array = Array(size)
+            array.color = hue_wheel(size)
+            frame = encoder.encode(array)
+            path = os.path.join(directory, 'spidev')
+            open(path, 'wb').close()
+            transport = SPITransport(path=path)
+            transport.open()
+            try:
+                results.append({
+                    'leds': size,
+                    'frame_bytes': len(frame),
+                    'encode': measure(lambda: encoder.encode(array), repeat),
+                    'transmit': measure(
+                        lambda: transport.write(frame), repeat),
+                    'bus_us': len(frame) * 8 / SPI_SPEED * 1e6,
+                })
+            finally:
+                transport.close()
+    return results
+
+
+def display(repeat: int=REPEAT) -> Dict[str, Dict[str, float]]:
+    """
+    Latency of a full `Board.display` per transport
+
+    The GPIO transport drives a stub module, so its time is the Python cost
+    of bit-banging without any delay. The emulator decodes every bit.
+    """
+    results = {}
+    board = Board()
+    previous = board.transport
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'spidev')
+        open(path, 'wb').close()
+        transports = {
+            'gpio': GPIOTransport(timing=NoDelay(), gpio=StubGPIO()),
+            'spi': SPITransport(path=path),
+            'emulator': EmulatorTransport(board.num_leds),
+        }  # type: Dict[str, Transport]
+        try:
+            for name, transport in transports.items():
+                board.transport = transport
+                with board:
+                    board.leds.color = hue_wheel(board.num_leds)
+                    results[name] = measure(
+                        lambda: board.display(force=True), repeat)
+        finally:
+            board.transport = previous
+    return results
+
+
+def contention(
+        threads: Sequence[int]=THREADS,
+        number: int=OPERATIONS,
+) -> List[Dict[str, Any]]:
+    """
+    Led sets per second with N threads, owning leds or ranges of leds
+
+    Every thread repeatedly takes ownership of its own led and sets it, so the
+    only contention is on the shared state of the array. Then every thread
+    claims a range of two leds that overlaps the range of the next thread,
+    and the time spent waiting is profiled per range.
+    """
+    results = []
+    for count in threads:
+        array = Array(max(count, NUM_LEDS) + 1)
+        stats = Stats()
+        stats.enabled = True
+        array.on_wait = stats.ownership_wait
+        leds = [array[i] for i in range(count)]
+        ranges = [array[i:i + 2] for i in range(count)]
+        results.append({
+            'threads': count,
+            'sets_per_s': _concurrent_sets(leds, number),
+            'range_sets_per_s': _concurrent_sets(ranges, number),
+            'range_wait': stats.contention(),
+        })
+    return results
+
+
+def _concurrent_sets(
+        claims: Sequence[Any],
+        number: int,
+) -> float:
+    """Sets per second of one thread per claim, each one owning its claim"""
+    barrier = Barrier(len(claims) + 1)
+
+    def work(claim: Any) -> None:
+        color = Color(1, 2, 3)
+        barrier.wait()
+        for _ in range(number):
+            with claim:
+                claim.color = color
+        barrier.wait()
+
+    workers = [Thread(target=work, args=(claim,)) for claim in claims]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = perf_counter()
+    barrier.wait()
+    elapsed = perf_counter() - start
+    for worker in workers:
+        worker.join()
+    return len(claims) * number / elapsed
+
+
+def daemon(number: int=OPERATIONS, fps: float=FPS) -> Dict[str, Any]:
+    """
+    Updates per second applied by a `Server` from a single `Client`
+
+    The board is displayed at `fps` through an `SPITransport` writing to a
+    temporary file while the client sends whole-board updates as fast as it
+    can, both as packed state and as Open Pixel Control pixels. The rate
+    counts until the server has applied the last update.
+    """
+    results = {}  # type: Dict[str, Any]
+    board = Board()
+    previous = board.transport
+    state = bytes(range(board.num_leds * 4))
+    rgb = bytes(range(board.num_leds * 3))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'spidev')
+        open(path, 'wb').close()
+        board.transport = SPITransport(path=path)
+        try:
+            with Server(board, os.path.join(directory, 'socket'),
+                        fps=fps) as server, Client(server.path) as client:
+                for name, send, data in (('state', client.set_state, state),
+                                         ('opc', client.set_pixels, rgb)):
+                    expected = server.updates + number
+                    frames = board.scheduler.frames
+                    start = perf_counter()
+                    for _ in range(number):
+                        send(data)
+                    while server.updates < expected:
+                        sleep(0.001)
+                    elapsed = perf_counter() - start
+                    results[name + '_updates_per_s'] = number / elapsed
+                    results[name + '_frames'] = \
+                        board.scheduler.frames - frames
+        finally:
+            board.transport = previous
+    return results
+
+
+def imports(repeat: int=IMPORT_REPEAT) -> Dict[str, Any]:
+    """
+    Time to import the package in a fresh interpreter, and the modules that it
+    imports, which must not include any hardware module
+    """
+    script = _IMPORT_SCRIPT.format(package=__package__)
+    environment = dict(os.environ)
+    environment['PYTHONPATH'] = os.pathsep.join(filter(None, (
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        environment.get('PYTHONPATH'))))
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', script],
+                                env=environment, check=True,
+                                stdout=subprocess.PIPE).stdout
+        elapsed, modules = json.loads(output.decode())
+        times.append(elapsed)
+    return {
+        'best_ms': min(times) * 1e3,
+        'mean_ms': sum(times) / len(times) * 1e3,
+        'modules': len(modules),
+        'hardware_modules': [module for module in modules
+                             if module.split('.')[0] in HARDWARE_MODULES],
+    }
+
+
+BENCHMARKS = {
+    'setters': lambda args: setters(args.number),
+    'colors': lambda args: colors(args.number),
+    'chain': lambda args: chain(args.sizes, args.repeat),
+    'display': lambda args: display(args.repeat),
+    'contention': lambda args: contention(args.threads, args.number),
+    'daemon': lambda args: daemon(args.number),
+    'imports': lambda args: imports(),
+}  # type: Dict[str, Callable[[argparse.Namespace], Any]]
+
+
+def main(argv: Optional[Sequence[str]]=None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m blinkt.bench",
+        description="Benchmarks of the hot paths of the library, written to "
+                    "the standard output as JSON")
+    parser.add_argument('benchmarks', nargs='*', metavar='benchmark',
+                        help="benchmarks to run among {} (all by default)"
+                             .format(", ".join(BENCHMARKS)))
+    parser.add_argument('--repeat', type=int, default=REPEAT,
+                        help="repetitions of latency measurements")
+    parser.add_argument('--number', type=int, default=OPERATIONS,
+                        help="operations of throughput measurements")
+    parser.add_argument('--sizes', type=int, nargs='+', default=CHAIN_SIZES,
+                        help="chain lengths of the chain benchmark")
+    parser.add_argument('--threads', type=int, nargs='+', default=THREADS,
+                        help="thread counts of the contention benchmark")
+    parser.add_argument('--output', help="file to write instead of stdout")
+    args = parser.parse_args(argv)
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error("unknown benchmark: {}".format(name))
+
+    report = {
+        'timestamp': time(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'results': {name: BENCHMARKS[name](args)
+                    for name in args.benchmarks or BENCHMARKS},
+    }
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -21,64 +21,108 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
-from threading import Lock
-from time import sleep
+from threading import Condition, Lock
+from time import perf_counter_ns, sleep
 from types import TracebackType
-from typing import Optional, Type
+from typing import AsyncIterator, Optional, Tuple, Type, TYPE_CHECKING
 
-from .leds import Array
-from .singleton import Singleton
+from . import backends
+from .correction import Correction
+from .encoder import Encoder, LED_FRAME_SIZE, wrap
+from .errors import DisplayError
+from .frame import Frame
+from .leds import Array, LED_SIZE, NUM_LEDS
+from .recording import Recorder
+from .scheduler import Producer, Scheduler
+from .singleton import Multiton
+from .stats import Stats
+from .transport import Transport
 
-import RPi.GPIO as GPIO
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Future, ThreadPoolExecutor
 
-CHANNEL_MODE = GPIO.BOARD
-DATA_CHANNEL = 16
-CLOCK_CHANNEL = 18
-CLOCK_PERIOD = 0.000001
 
-
-class Error(Exception):
-    """Base module exception"""
-
-
-class DisplayError(Error):
-    """Display-related errors"""
-
-
-class Board(metaclass=Singleton):
+class Board(metaclass=Multiton):
     """
     Virtual representation of a Blinkt board
 
-    It has two properties: `leds` (read-only) and `clear`.
+    Its main properties are `name` and `leds` (read-only), `num_leds`,
+    `clear`, `backend`, `transport` and `correction`.
+
+    `Board()` is the default board. Other boards, each one with its own leds
+    and transport (e.g. a `GPIOTransport` on different pins), are obtained by
+    name: `Board('left')` always returns the same instance.
 
     It acts as a context manager, allowing to call the `display` method to copy
     the virtual `leds` state to the physical board.
 
     This class is completely thread-safe, even opening contexts from different
     threads is allowed.
-    """
 
-    __slots__ = ('_array', '_clear', '_lock', '_counter', '_half_period')
+    It is also an asynchronous context manager. The asynchronous API runs the
+    blocking operations in a dedicated single worker thread, so the event loop
+    is not stalled while frames are being sent.
+
+    Importing the board does not import any backend: the transport is created
+    when the board is first set up, from the selected `backend`.
+    """
 
-    def __init__(self) -> None:
-        self._array = Array()
+    __slots__ = ('_name', '_array', '_encoder', '_backend', '_transport',
+                 '_resolved', '_clear', '_lock', '_counter', '_sent', '_frame',
+                 '_skipped', '_truncated', '_scheduler', '_executor',
+                 '_pending', '_pending_force', '_pending_lock', '_recorder',
+                 '_stats', '_coalesce', '_max_latency', '_requests',
+                 '_requested', '_served', '_request_force', '_transmitting',
+                 '_merged')
+
+    def __init__(self, name: Optional[str]=None) -> None:
+        self._name = name
+        self._stats = Stats()
+        self._array = Array(NUM_LEDS)
+        self._array.on_wait = self._stats.ownership_wait
+        self._encoder = Encoder()
+        self._backend = None  # type: Optional[str]
+        self._transport = None  # type: Optional[Transport]
+        # Whether the transport was created from the backend
+        self._resolved = False
         self._clear = False
         self._lock = Lock()
         self._counter = 0
-        self._half_period = CLOCK_PERIOD / 2
+        self._sent = None  # type: Optional[int]
+        # State of every led in the last frame sent
+        self._frame = None  # type: Optional[Frame]
+        self._skipped = 0
+        self._truncated = 0
+        self._scheduler = None  # type: Optional[Scheduler]
+        self._executor = None  # type: Optional[ThreadPoolExecutor]
+        self._pending = None  # type: Optional[Future]
+        self._pending_force = False
+        self._pending_lock = Lock()
+        self._recorder = None  # type: Optional[Recorder]
+        # Display requests: tickets issued and served by the transmitter
+        self._coalesce = False
+        self._max_latency = 0.0
+        self._requests = Condition(Lock())
+        self._requested = 0
+        self._served = 0
+        self._request_force = False
+        self._transmitting = False
+        self._merged = 0
 
     def __str__(self) -> str:
-        return "<Blinkt {}>".format(self._array)
+        if self._name is None:
+            return "<Blinkt {}>".format(self._array)
+        return "<Blinkt {} {}>".format(self._name, self._array)
 
     def __enter__(self) -> "Board":
         """Setup the board"""
         with self._lock:
-            # Setup the GPIO if it is unset
+            # Setup the transport if it is unset
             if self._counter == 0:
-                GPIO.setmode(CHANNEL_MODE)
-                GPIO.setwarnings(False)
-                GPIO.setup(DATA_CHANNEL, GPIO.OUT)
-                GPIO.setup(CLOCK_CHANNEL, GPIO.OUT)
+                self._resolve().open()
+                # The state of the physical leds is unknown
+                self._sent = None
+                self._frame = None
 
             # Increment the counter
             self._counter += 1
@@ -92,22 +136,50 @@ class Board(metaclass=Singleton):
             exc_tb: Optional[TracebackType],
     ) -> bool:
         """Cleanup the board"""
+        scheduler = None
         with self._lock:
             # Decrease the counter
             self._counter -= 1
 
             if self._counter == 0:
+                # Stop the render thread, it may be waiting for the lock
+                scheduler, self._scheduler = self._scheduler, None
+                if scheduler is not None:
+                    scheduler.signal()
+
                 # Shut off the leds if specified
                 if self._clear:
                     del self._array.color
-                    self._display()
+                    self._display(True)
 
-                # Cleanup the GPIO
-                GPIO.cleanup()
+                # Cleanup the transport
+                self._transport.close()
+
+        if scheduler is not None:
+            scheduler.stop()
 
         # Raise exceptions if any
         return False
 
+    async def __aenter__(self) -> "Board":
+        """Setup the board without blocking the event loop"""
+        await self._run(self.__enter__)
+        return self
+
+    async def __aexit__(
+            self,
+            exc_type: Optional[Type[BaseException]],
+            exc_val: Optional[Exception],
+            exc_tb: Optional[TracebackType],
+    ) -> bool:
+        """Cleanup the board without blocking the event loop"""
+        return await self._run(self.__exit__, exc_type, exc_val, exc_tb)
+
+    @property
+    def name(self) -> Optional[str]:
+        """Name of the board, None for the default one"""
+        return self._name
+
     @property
     def leds(self) -> Array:
         """
@@ -127,6 +199,54 @@ class Board(metaclass=Singleton):
         """
         return self._array
 
+    @property
+    def num_leds(self) -> int:
+        """
+        Length of the led chain, 8 for a Blinkt board
+
+        It can only be changed while the board is not in use. Changing it
+        replaces the `leds` sequence, so previous references to it or to its
+        leds are no longer displayed, and a shared one (see `share`) is closed.
+        """
+        return len(self._array)
+
+    @num_leds.setter
+    def num_leds(self, value: int) -> None:
+        with self._lock:
+            if self._counter > 0:
+                raise DisplayError(
+                    "The number of leds can not be changed while in use")
+            self._replace(Array(value))
+            # A backend transport may depend on the length of the chain
+            if self._resolved:
+                self._transport = None
+
+    def share(self, name: Optional[str]=None) -> str:
+        """
+        Move the leds state to a shared memory segment and return its name
+
+        Other processes can write the leds through `Array.attach(name)` and
+        their changes are picked up by the next `display`, without any
+        serialization. Only one process should write at a time.
+
+        It can only be done while the board is not in use, and replaces the
+        `leds` sequence like `num_leds`, keeping its state. The segment is
+        removed by `leds.close()`, or at exit.
+        """
+        with self._lock:
+            if self._counter > 0:
+                raise DisplayError("The leds can not be shared while in use")
+            array = Array.shared(len(self._array), name)
+            array.load(self._array.dump())
+            self._replace(array)
+            return self._array.name
+
+    def _replace(self, array: Array) -> None:
+        # Must be called with the lock held
+        self._array.close()
+        self._array = array
+        self._array.on_wait = self._stats.ownership_wait
+
     @property
     def clear(self) -> bool:
         """Whether the leds will be shut down when the device is released"""
@@ -140,44 +260,417 @@ class Board(metaclass=Singleton):
     def clear(self) -> None:
         self._clear = False
 
-    def _clock(self) -> None:
-        GPIO.output(CLOCK_CHANNEL, True)
-        sleep(self._half_period)
-        GPIO.output(CLOCK_CHANNEL, False)
-        sleep(self._half_period)
-
-    def _send_bit(self, value: bool) -> None:
-        GPIO.output(DATA_CHANNEL, value)
-        self._clock()
-
-    def _send_bits(self, value: bool, n: int) -> None:
-        GPIO.output(DATA_CHANNEL, value)
-        for _ in range(n):
-            self._clock()
-
-    def _display(self) -> None:
-        # Start frame
-        self._send_bits(False, 32)
-        # Led frames
-        for led in self._array:
-            color, brightness = led.all
-            # First byte: 1110 0000 & brightness (000x xxxx) = 111x xxxx
-            self._send_bits(True, 3)
-            for bit in ((brightness >> i) & 1 for i in range(4, -1, -1)):
-                self._send_bit(bit)
-            # Second byte: blue
-            for bit in ((color.b >> i) & 1 for i in range(7, -1, -1)):
-                self._send_bit(bit)
-            # Second byte: green
-            for bit in ((color.g >> i) & 1 for i in range(7, -1, -1)):
-                self._send_bit(bit)
-            # Second byte: red
-            for bit in ((color.r >> i) & 1 for i in range(7, -1, -1)):
-                self._send_bit(bit)
-        # End frame
-        self._send_bits(True, (len(self._array) + 1) // 2)
-
-    def display(self) -> None:
+    @property
+    def backend(self) -> str:
+        """
+        Name of the backend that creates the transport (see `backends`)
+
+        Unless it is set, it is taken from the BLINKT_BACKEND environment
+        variable, and it defaults to bit-banging through GPIO. It can only be
+        changed while the board is not in use, and it replaces the transport.
+        """
+        return backends.selected(self._backend)
+
+    @backend.setter
+    def backend(self, value: Optional[str]) -> None:
         with self._lock:
             if self._counter > 0:
-                self._display()
+                raise DisplayError(
+                    "The backend can not be changed while in use")
+            self._backend = value
+            self._transport = None
+
+    @backend.deleter
+    def backend(self) -> None:
+        self.backend = None
+
+    @property
+    def transport(self) -> Transport:
+        """
+        Link used to send the frames to the physical board
+
+        Created from the `backend` the first time it is needed, unless it is
+        set. It can only be changed while the board is not in use.
+        """
+        with self._lock:
+            return self._resolve()
+
+    @transport.setter
+    def transport(self, value: Optional[Transport]) -> None:
+        with self._lock:
+            if self._counter > 0:
+                raise DisplayError(
+                    "The transport can not be changed while in use")
+            self._transport = value
+            self._resolved = False
+
+    def _resolve(self) -> Transport:
+        # Must be called with the lock held
+        if self._transport is None:
+            self._transport = backends.create(self._backend, len(self._array))
+            self._resolved = True
+        return self._transport
+
+    @property
+    def correction(self) -> Optional[Correction]:
+        """Color correction applied when the frames are encoded, if any"""
+        return self._encoder.correction
+
+    @correction.setter
+    def correction(self, value: Optional[Correction]) -> None:
+        with self._lock:
+            self._encoder = Encoder(value)
+            # Every led looks different now
+            self._sent = None
+            self._frame = None
+
+    @correction.deleter
+    def correction(self) -> None:
+        self.correction = None
+
+    @property
+    def recorder(self) -> Optional[Recorder]:
+        """Recorder that receives every displayed frame, if any"""
+        return self._recorder
+
+    @recorder.setter
+    def recorder(self, value: Optional[Recorder]) -> None:
+        if value is not None and value.num_leds != len(self._array):
+            raise DisplayError("The recorder expects {} leds".format(
+                value.num_leds))
+        with self._lock:
+            self._recorder = value
+
+    @recorder.deleter
+    def recorder(self) -> None:
+        self.recorder = None
+
+    @property
+    def stats(self) -> Stats:
+        """
+        Per-frame instrumentation, disabled by default
+
+        Set `board.stats.enabled = True` to start measuring.
+        """
+        return self._stats
+
+    @property
+    def skipped_frames(self) -> int:
+        """Number of `display` calls skipped because nothing changed"""
+        return self._skipped
+
+    @property
+    def truncated_frames(self) -> int:
+        """Number of frames that only included the leading leds"""
+        return self._truncated
+
+    @property
+    def coalesce(self) -> bool:
+        """
+        Whether concurrent `display` calls are coalesced
+
+        When set, a call made while another thread is transmitting does not
+        transmit on its own: it waits for the next transmission, which sends
+        the latest state for every caller that arrived in the meantime.
+        """
+        return self._coalesce
+
+    @coalesce.setter
+    def coalesce(self, value: bool) -> None:
+        self._coalesce = value
+
+    @property
+    def max_latency(self) -> float:
+        """
+        Seconds a coalesced transmission waits for more requests to arrive
+
+        Zero by default, so transmissions start at once and only the calls
+        made during a transmission are merged.
+        """
+        return self._max_latency
+
+    @max_latency.setter
+    def max_latency(self, value: float) -> None:
+        if value < 0:
+            raise ValueError("max_latency can not be negative")
+        self._max_latency = value
+
+    @property
+    def merged_requests(self) -> int:
+        """Number of `display` calls served by another caller's transmission"""
+        return self._merged
+
+    @property
+    def scheduler(self) -> Optional[Scheduler]:
+        """Render scheduler started with `schedule`, if any"""
+        return self._scheduler
+
+    def schedule(
+            self,
+            fps: float,
+            producer: Optional[Producer]=None,
+    ) -> Scheduler:
+        """
+        Display the board from a background thread at `fps` frames per second
+
+        `producer` is called (or advanced, if it is an iterator) before every
+        frame to update the leds. The scheduler is stopped when the board is
+        released, or it can be stopped earlier through its `stop` method.
+        """
+        with self._lock:
+            if self._counter == 0:
+                raise DisplayError("The board is not in use")
+            if self._scheduler is not None and self._scheduler.running:
+                raise DisplayError("The board is already scheduled")
+            self._scheduler = Scheduler(self, fps, producer)
+            self._scheduler.start()
+            return self._scheduler
+
+    def _display(
+            self,
+            force: bool=False,
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Send the changed leds
+
+        Returns the number of leds and bytes sent and the nanoseconds spent
+        encoding and transmitting, or None if nothing was sent.
+        """
+        prepared = self._prepare(force)
+        if prepared is None:
+            return None
+        frame, num_leds, _, _, encode = prepared
+        return num_leds, len(frame), encode, self._commit(prepared)
+
+    def _prepare(
+            self,
+            force: bool=False,
+    ) -> Optional[Tuple[bytes, int, int, Frame, int]]:
+        """
+        Encode the changed leds (lock held)
+
+        Returns the frame, the number of leds in it, the checkpoint and the
+        snapshot to keep once it is sent and the nanoseconds spent encoding,
+        or None if there is nothing to send.
+        """
+        # Changes made after the checkpoint will be sent in the next frame
+        checkpoint = self._array.checkpoint()
+        num_leds = len(self._array)
+        if not force and self._sent is not None:
+            num_leds = self._array.changed(self._sent)
+            if num_leds == 0:
+                self._skipped += 1
+                return None
+
+        snapshot = self._array.snapshot()
+        if not force and self._frame is not None:
+            # Leds may have been set to the values they already had, only
+            # the ones changed since the last frame have to be compared
+            changed = snapshot.diff(self._frame, num_leds)
+            if not changed:
+                self._sent = checkpoint
+                self._skipped += 1
+                return None
+            # Leds after the last changed one keep their latched value
+            num_leds = changed[-1] + 1
+            if num_leds < len(self._array):
+                self._truncated += 1
+
+        start = perf_counter_ns()
+        if self._recorder is None:
+            frame = self._encoder.encode_state(snapshot[:num_leds * LED_SIZE])
+        else:
+            # Record the whole chain, even if the frame is truncated
+            leds = self._encoder.encode_leds(snapshot)
+            frame = wrap(leds[:num_leds * LED_FRAME_SIZE])
+            self._recorder.record(leds, start)
+        return (frame, num_leds, checkpoint, snapshot,
+                perf_counter_ns() - start)
+
+    def _commit(self, prepared: Tuple[bytes, int, int, Frame, int]) -> int:
+        """
+        Send a frame returned by `_prepare` (lock held)
+
+        Returns the nanoseconds spent transmitting.
+        """
+        frame, _, checkpoint, snapshot, _ = prepared
+        start = perf_counter_ns()
+        self._transport.write(frame)
+        transmitted = perf_counter_ns()
+        self._sent = checkpoint
+        self._frame = snapshot
+        return transmitted - start
+
+    def _worker(self) -> "ThreadPoolExecutor":
+        # Must be called with the pending lock held
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="blinkt")
+        return self._executor
+
+    def _submit(self, fn, *args) -> "Future":
+        with self._pending_lock:
+            return self._worker().submit(fn, *args)
+
+    async def _run(self, fn, *args):
+        # Shielded: cancelling a caller must not cancel the shared operation
+        import asyncio
+        future = self._submit(fn, *args)
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _display_pending(self) -> None:
+        # Requests made from now on will need another transmission
+        with self._pending_lock:
+            self._pending = None
+            force, self._pending_force = self._pending_force, False
+        self.display(force)
+
+    async def display_async(self, force: bool=False) -> None:
+        """
+        Asynchronous version of `display`
+
+        Requests are coalesced: every request made while a transmission is
+        waiting to start is fulfilled by that single transmission.
+        """
+        import asyncio
+        with self._pending_lock:
+            self._pending_force |= force
+            if self._pending is None:
+                self._pending = self._worker().submit(self._display_pending)
+            pending = self._pending
+        await asyncio.shield(asyncio.wrap_future(pending))
+
+    async def frames(self, fps: float) -> AsyncIterator[int]:
+        """
+        Asynchronous iterator of frame numbers paced at `fps` frames per second
+
+        The board is displayed after every iteration, so the body of the loop
+        only has to update the leds:
+
+            async for frame in board.frames(30):
+                board.leds.color = Color.hsv(frame / 100, 1.0, 1.0)
+        """
+        if fps <= 0:
+            raise ValueError("fps must be positive")
+        import asyncio
+        loop = asyncio.get_running_loop()
+        period = 1 / fps
+        deadline = loop.time()
+        frame = 0
+        while True:
+            yield frame
+            await self.display_async()
+            frame += 1
+
+            deadline += period
+            now = loop.time()
+            if now > deadline:
+                # Skip the frame slots that can no longer be met
+                missed = int((now - deadline) // period) + 1
+                frame += missed
+                deadline += missed * period
+            await asyncio.sleep(deadline - now)
+
+    def send(self, leds: bytes) -> None:
+        """
+        Send already encoded led frames, bypassing the `leds` state
+
+        This is how recorded or precomputed frames are shown without any
+        per-frame computation. The next `display` call sends the whole frame
+        again, as the physical leds no longer match the `leds` state.
+        """
+        size = len(leds)
+        if size % LED_FRAME_SIZE or size > len(self._array) * LED_SIZE:
+            raise DisplayError("Invalid led frames")
+        with self._lock:
+            if self._counter > 0:
+                self._transport.write(wrap(leds))
+                self._sent = None
+                self._frame = None
+
+    def display(self, force: bool=False) -> None:
+        """
+        Copy the virtual `leds` state to the physical board
+
+        Only the leds changed since the previous frame are sent: nothing at all
+        if no led changed, or the leading leds up to the last changed one.
+        `force` sends the whole frame regardless of the changes.
+
+        With `coalesce` set, concurrent calls share transmissions, but every
+        call still returns once a frame with its changes was sent.
+        """
+        if not self._coalesce:
+            self._transmit(force)
+            return
+
+        requests = self._requests
+        with requests:
+            self._requested += 1
+            ticket = self._requested
+            self._request_force |= force
+            while self._transmitting:
+                requests.wait()
+                if self._served >= ticket:
+                    self._merged += 1
+                    self._stats.merged()
+                    return
+            self._transmitting = True
+
+        # This caller transmits until no request is left
+        force = False
+        try:
+            while True:
+                if self._max_latency:
+                    sleep(self._max_latency)
+                with requests:
+                    # Every request issued up to now is served by this frame
+                    batch = self._requested
+                    force, self._request_force = self._request_force, False
+                self._transmit(force)
+                with requests:
+                    self._served = batch
+                    requests.notify_all()
+                    if self._requested == batch:
+                        self._transmitting = False
+                        return
+        except BaseException:
+            # A waiting caller takes over, forced if the failed frame was
+            with requests:
+                self._request_force |= force
+                self._transmitting = False
+                requests.notify_all()
+            raise
+
+    def _transmit(self, force: bool) -> None:
+        stats = self._stats
+        if not stats.enabled:
+            with self._lock:
+                if self._counter > 0:
+                    self._display(force)
+            return
+
+        start = perf_counter_ns()
+        with self._lock:
+            locked = perf_counter_ns()
+            if self._counter == 0:
+                return
+            result = self._display(force)
+
+        # Out of the lock, as hooks may take their time
+        self._report(start, locked, result)
+
+    def _report(
+            self,
+            start: int,
+            locked: int,
+            result: Optional[Tuple[int, int, int, int]],
+    ) -> None:
+        """Record a display in the stats, out of the lock"""
+        stats = self._stats
+        if result is None:
+            stats.skipped(locked - start)
+        else:
+            num_leds, size, encode, transmit = result
+            stats.frame(locked + encode + transmit, locked - start, encode,
+                        transmit, num_leds, size, num_leds < self.num_leds)
@@ -22,10 +22,134 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 import colorsys
+from functools import lru_cache
+from itertools import repeat
+from typing import Any, Callable, Iterable, Sequence, Tuple, Union
 
 
 BIT_DEPTH = 255
 
+Channel = Union[float, Sequence[float]]
+
+
+@lru_cache(maxsize=None)
+def _numpy() -> Any:
+    """NumPy module if available, imported lazily"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _broadcast(*channels: Channel) -> Iterable[Tuple[float, ...]]:
+    """Zip channels repeating the scalar ones"""
+    lengths = [len(c) for c in channels if not isinstance(c, (int, float))]
+    if not lengths:
+        return iter((channels,))
+    if any(length != lengths[0] for length in lengths):
+        raise ValueError("Channels must have the same length")
+    return zip(*(repeat(c, lengths[0]) if isinstance(c, (int, float)) else c
+                 for c in channels))
+
+
+def _pack(
+        convert: Callable[[float, float, float], Tuple[float, float, float]],
+        a: Channel,
+        b: Channel,
+        c: Channel,
+) -> bytes:
+    """Pure Python batch conversion with the same rounding as `Color.rgb`"""
+    packed = bytearray()
+    for x, y, z in _broadcast(a, b, c):
+        for value in convert(x, y, z):
+            value = 1.0 if value >= 1.0 else 0.0 if value <= 0.0 else value
+            packed.append(int(value * BIT_DEPTH))
+    return bytes(packed)
+
+
+def _pack_numpy(np: Any, r: Any, g: Any, b: Any) -> bytes:
+    """Clamp and quantize float channels the same way as `Color.rgb`"""
+    rgb = np.stack(np.broadcast_arrays(r, g, b), axis=-1).reshape(-1, 3)
+    return (np.clip(rgb, 0.0, 1.0) * BIT_DEPTH).astype(np.uint8).tobytes()
+
+
+def hsv_to_rgb8(h: Channel, s: Channel, v: Channel) -> bytes:
+    """
+    Batch HSV conversion to packed 8-bit RGB triples
+
+    Channels can be sequences (or NumPy arrays) of the same length or
+    scalars, which are repeated. The result is identical to converting every
+    color with `Color.hsv`, and computed in a single vectorized pass if NumPy
+    is available.
+    """
+    np = _numpy()
+    if np is None:
+        return _pack(colorsys.hsv_to_rgb, h, s, v)
+
+    h, s, v = np.broadcast_arrays(*(np.asarray(c, dtype=np.float64)
+                                    for c in (h, s, v)))
+    # Same operations as colorsys.hsv_to_rgb
+    h6 = h * 6.0
+    i = np.trunc(h6)
+    f = h6 - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = np.where(s == 0.0, 0, i.astype(np.int64) % 6)
+    p = np.where(s == 0.0, v, p)
+    q = np.where(s == 0.0, v, q)
+    t = np.where(s == 0.0, v, t)
+    r = np.choose(i, (v, q, p, p, t, v))
+    g = np.choose(i, (t, v, v, q, p, p))
+    b = np.choose(i, (p, p, t, v, v, q))
+    return _pack_numpy(np, r, g, b)
+
+
+def hls_to_rgb8(h: Channel, l: Channel, s: Channel) -> bytes:
+    """Batch HLS conversion to packed 8-bit RGB triples, see `hsv_to_rgb8`"""
+    np = _numpy()
+    if np is None:
+        return _pack(colorsys.hls_to_rgb, h, l, s)
+
+    h, l, s = np.broadcast_arrays(*(np.asarray(c, dtype=np.float64)
+                                    for c in (h, l, s)))
+    # Same operations as colorsys.hls_to_rgb
+    m2 = np.where(l <= 0.5, l * (1.0 + s), l + s - (l * s))
+    m1 = 2.0 * l - m2
+
+    def v(hue: Any) -> Any:
+        hue = hue % 1.0
+        return np.where(
+            hue < colorsys.ONE_SIXTH, m1 + (m2 - m1) * hue * 6.0,
+            np.where(
+                hue < 0.5, m2,
+                np.where(
+                    hue < colorsys.TWO_THIRD,
+                    m1 + (m2 - m1) * (colorsys.TWO_THIRD - hue) * 6.0,
+                    m1)))
+
+    grey = s == 0.0
+    r = np.where(grey, l, v(h + colorsys.ONE_THIRD))
+    g = np.where(grey, l, v(h))
+    b = np.where(grey, l, v(h - colorsys.ONE_THIRD))
+    return _pack_numpy(np, r, g, b)
+
+
+def yiq_to_rgb8(y: Channel, i: Channel, q: Channel) -> bytes:
+    """Batch YIQ conversion to packed 8-bit RGB triples, see `hsv_to_rgb8`"""
+    np = _numpy()
+    if np is None:
+        return _pack(colorsys.yiq_to_rgb, y, i, q)
+
+    y, i, q = np.broadcast_arrays(*(np.asarray(c, dtype=np.float64)
+                                    for c in (y, i, q)))
+    # Same operations as colorsys.yiq_to_rgb, clamped by _pack_numpy
+    r = y + 0.9468822170900693*i + 0.6235565819861433*q
+    g = y - 0.27478764629897834*i - 0.6356910791873801*q
+    b = y - 1.1085450346420322*i + 1.7090069284064666*q
+    return _pack_numpy(np, r, g, b)
+
 
 class Color:
     __slots__ = ('_r', '_g', '_b')
@@ -60,6 +184,47 @@ class Color:
         # TODO: boundary check?
         return cls.rgb(*colorsys.yiq_to_rgb(y, i, q))
 
+    @classmethod
+    def unpack(cls, packed: bytes) -> Tuple["Color", ...]:
+        """Colors from packed 8-bit RGB triples"""
+        colors = []
+        for r, g, b in zip(packed[0::3], packed[1::3], packed[2::3]):
+            # Values are already within bounds
+            color = cls.__new__(cls)
+            color._r, color._g, color._b = r, g, b
+            colors.append(color)
+        return tuple(colors)
+
+    @classmethod
+    def hls_many(
+            cls,
+            h: Channel,
+            l: Channel,
+            s: Channel,
+    ) -> Tuple["Color", ...]:
+        """Batch version of `hls`, see `hls_to_rgb8`"""
+        return cls.unpack(hls_to_rgb8(h, l, s))
+
+    @classmethod
+    def hsv_many(
+            cls,
+            h: Channel,
+            s: Channel,
+            v: Channel,
+    ) -> Tuple["Color", ...]:
+        """Batch version of `hsv`, see `hsv_to_rgb8`"""
+        return cls.unpack(hsv_to_rgb8(h, s, v))
+
+    @classmethod
+    def yiq_many(
+            cls,
+            y: Channel,
+            i: Channel,
+            q: Channel,
+    ) -> Tuple["Color", ...]:
+        """Batch version of `yiq`, see `yiq_to_rgb8`"""
+        return cls.unpack(yiq_to_rgb8(y, i, q))
+
     def __str__(self) -> str:
         return "RGB({}, {}, {})".format(self._r, self._g, self._b)
 
@@ -74,3 +239,14 @@ class Color:
     @property
     def b(self) -> int:
         return self._b
+
+
+@lru_cache(maxsize=16)
+def hue_wheel(steps: int=256) -> Tuple[Color, ...]:
+    """
+    Fully saturated colors of `steps` evenly spaced hues
+
+    The result is cached, so effects that cycle through the hues can index it
+    instead of converting colors every frame.
+    """
+    return Color.hsv_many([i / steps for i in range(steps)], 1.0, 1.0)
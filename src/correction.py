@@ -0,0 +1,98 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from typing import Sequence, Tuple, Union
+
+from .colors import BIT_DEPTH
+from .encoder import LED_HEADER
+from .leds import MAX_BRIGHTNESS
+
+Triplet = Union[float, Sequence[float]]
+
+
+def _triplet(value: Triplet) -> Tuple[float, float, float]:
+    if isinstance(value, (int, float)):
+        return value, value, value
+    r, g, b = value
+    return r, g, b
+
+
+def _clamp(value: float, maximum: int) -> int:
+    value = int(value + 0.5)
+    return maximum if value >= maximum else 0 if value <= 0 else value
+
+
+class Correction:
+    """
+    Color correction applied while the frames are encoded
+
+    It combines per channel gamma correction, white point scaling (the
+    maximum value of each channel, range 0..1) and a ceiling for the global
+    brightness (range 0..1). Everything is precomputed once into 256-entry
+    translation tables, so correcting a frame costs a table lookup per byte.
+    """
+
+    __slots__ = ('_gamma', '_white_point', '_max_brightness', '_tables')
+
+    def __init__(
+            self,
+            gamma: Triplet=1.0,
+            white_point: Triplet=1.0,
+            max_brightness: float=1.0,
+    ) -> None:
+        self._gamma = _triplet(gamma)
+        self._white_point = _triplet(white_point)
+        self._max_brightness = max_brightness
+
+        # Tables in led frame order: brightness header, blue, green and red
+        red, green, blue = (
+            bytes(_clamp(((i / BIT_DEPTH) ** gamma) * white * BIT_DEPTH,
+                         BIT_DEPTH)
+                  for i in range(256))
+            for gamma, white in zip(self._gamma, self._white_point))
+        headers = bytes(
+            LED_HEADER | _clamp(
+                min(i, MAX_BRIGHTNESS) * max_brightness, MAX_BRIGHTNESS)
+            for i in range(256))
+        self._tables = (headers, blue, green, red)
+
+    def __str__(self) -> str:
+        return "<Correction gamma={} white_point={} max_brightness={}>".format(
+            self._gamma, self._white_point, self._max_brightness)
+
+    @property
+    def gamma(self) -> Tuple[float, float, float]:
+        return self._gamma
+
+    @property
+    def white_point(self) -> Tuple[float, float, float]:
+        return self._white_point
+
+    @property
+    def max_brightness(self) -> float:
+        return self._max_brightness
+
+    @property
+    def tables(self) -> Tuple[bytes, bytes, bytes, bytes]:
+        """Translation tables for the header, blue, green and red bytes"""
+        return self._tables
@@ -0,0 +1,350 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import os
+import socket
+import socketserver
+import stat
+from struct import Struct
+from threading import Event, Lock, Thread
+from types import TracebackType
+from typing import List, Optional, Sequence, Type, Union
+
+from .board import Board
+from .colors import Color
+from .errors import DaemonError
+from .leds import BLUE, BRIGHTNESS, GREEN, LED_SIZE, RED, _quantize
+
+SOCKET_PATH = '/tmp/blinkt.sock'
+OPC_PORT = 7890
+FPS = 60
+
+# Open Pixel Control message header: channel, command and data length
+HEADER = Struct('>BBH')
+MAX_DATA = 0xFFFF
+BROADCAST = 0
+CHANNEL = 1
+SET_PIXELS = 0
+SYSTEM_EXCLUSIVE = 255
+
+# System exclusive message header: system id, command and first led
+SYSTEM_HEADER = Struct('>HBH')
+SYSTEM_ID = 0x424C  # 'BL'
+SET_STATE = 0
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Applies the messages of a connection until it is closed"""
+
+    def handle(self) -> None:
+        read = self.rfile.read
+        apply = self.server.daemon.apply
+        while True:
+            header = read(HEADER.size)
+            if len(header) < HEADER.size:
+                return
+            channel, command, length = HEADER.unpack(header)
+            data = read(length)
+            if len(data) < length:
+                return
+            if channel in (BROADCAST, CHANNEL):
+                apply(command, data)
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def _remove_stale(path: str) -> None:
+    """Remove the socket left behind at `path` by a dead server"""
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            raise DaemonError("{} is not a socket".format(path))
+    except FileNotFoundError:
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        os.unlink(path)
+    else:
+        raise DaemonError("A server is already listening on {}".format(path))
+    finally:
+        probe.close()
+
+
+class Server:
+    """
+    Daemon that owns the board and displays it on behalf of other processes
+
+    The board can only be driven by one process, so this server holds it and
+    applies the updates received from its clients through a Unix socket, and
+    optionally through TCP. Messages use the Open Pixel Control framing
+    (channel, command, big-endian data length and data), so OPC clients can
+    send whole frames of RGB pixels with command 0 on channel 0 or 1.
+
+    Partial updates use a system exclusive message (command 255) with the
+    system id 0x424C, a command byte (0, set state), the big-endian index of
+    the first led and the packed state of the updated leds in the layout of
+    `Array.dump`: brightness (0..31), blue, green and red.
+
+    Updates are written to the leds as they arrive, so concurrent updates are
+    coalesced: the board is displayed by its scheduler at a bounded frame rate
+    and each frame sends the latest state of every led, or nothing at all if
+    no led changed.
+    """
+
+    __slots__ = ('_board', '_path', '_port', '_fps', '_servers', '_threads',
+                 '_stopped', '_lock', '_updates', '_errors')
+
+    def __init__(
+            self,
+            board: Optional[Board]=None,
+            path: Optional[str]=SOCKET_PATH,
+            port: Optional[int]=None,
+            fps: float=FPS,
+    ) -> None:
+        if path is None and port is None:
+            raise ValueError("A socket path or a TCP port is required")
+        if fps <= 0:
+            raise ValueError("fps must be positive")
+        self._board = Board() if board is None else board
+        self._path = path
+        self._port = port
+        self._fps = fps
+        self._servers = []  # type: List[socketserver.BaseServer]
+        self._threads = []  # type: List[Thread]
+        self._stopped = Event()
+        self._lock = Lock()
+        self._updates = 0
+        self._errors = 0
+
+    def __enter__(self) -> "Server":
+        self.start()
+        return self
+
+    def __exit__(
+            self,
+            exc_type: Optional[Type[BaseException]],
+            exc_val: Optional[Exception],
+            exc_tb: Optional[TracebackType],
+    ) -> bool:
+        self.stop()
+        return False
+
+    @property
+    def board(self) -> Board:
+        return self._board
+
+    @property
+    def path(self) -> Optional[str]:
+        """Path of the Unix socket"""
+        return self._path
+
+    @property
+    def port(self) -> Optional[int]:
+        """TCP port, the bound one if 0 was requested"""
+        for server in self._servers:
+            if isinstance(server, _TCPServer):
+                return server.server_address[1]
+        return self._port
+
+    @property
+    def updates(self) -> int:
+        """Number of updates applied"""
+        return self._updates
+
+    @property
+    def errors(self) -> int:
+        """Number of messages rejected"""
+        return self._errors
+
+    def apply(self, command: int, data: bytes) -> bool:
+        """
+        Apply the message with `command` and `data` to the leds
+
+        Returns whether it was applied. Unknown system exclusive messages are
+        ignored, as the protocol requires.
+        """
+        leds = self._board.leds
+        try:
+            if command == SET_PIXELS:
+                # Pixels beyond the end of the chain are ignored
+                leds.load_rgb(data[:min(len(data) // 3, len(leds)) * 3])
+            elif command == SYSTEM_EXCLUSIVE:
+                if len(data) < SYSTEM_HEADER.size:
+                    raise ValueError("Truncated system exclusive message")
+                system, action, offset = SYSTEM_HEADER.unpack_from(data)
+                if system != SYSTEM_ID:
+                    return False
+                if action != SET_STATE:
+                    raise ValueError("Unknown command {}".format(action))
+                leds.load(data[SYSTEM_HEADER.size:], offset)
+            else:
+                raise ValueError("Unknown command {}".format(command))
+        except ValueError:
+            with self._lock:
+                self._errors += 1
+            return False
+        with self._lock:
+            self._updates += 1
+        return True
+
+    def start(self) -> None:
+        """Start displaying the board and listening in background threads"""
+        if self._servers:
+            raise DaemonError("The server is already started")
+        self._stopped.clear()
+        self._board.__enter__()
+        try:
+            self._board.schedule(self._fps)
+            if self._path is not None:
+                _remove_stale(self._path)
+                self._servers.append(_UnixServer(self._path, _Handler))
+            if self._port is not None:
+                self._servers.append(_TCPServer(('', self._port), _Handler))
+        except BaseException:
+            self._close()
+            raise
+        for server in self._servers:
+            server.daemon = self
+            thread = Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Stop listening and release the board"""
+        if not self._servers:
+            return
+        for server in self._servers:
+            server.shutdown()
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+        self._close()
+        self._stopped.set()
+
+    def _close(self) -> None:
+        for server in self._servers:
+            server.server_close()
+        if self._servers and self._path is not None:
+            os.unlink(self._path)
+        self._servers.clear()
+        self._board.__exit__(None, None, None)
+
+    def serve_forever(self) -> None:
+        """Serve until the server is stopped from another thread or a signal"""
+        self.start()
+        try:
+            self._stopped.wait()
+        finally:
+            if not self._stopped.is_set():
+                self.stop()
+
+
+class Client:
+    """
+    Connection to a `Server`, through its Unix socket or, if `host` is
+    provided, through TCP
+
+    Messages are sent without waiting for any reply, so updates are as cheap
+    as a single write to the socket.
+    """
+
+    __slots__ = ('_socket',)
+
+    def __init__(
+            self,
+            path: str=SOCKET_PATH,
+            host: Optional[str]=None,
+            port: int=OPC_PORT,
+    ) -> None:
+        if host is None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                self._socket.connect(path)
+            except OSError:
+                self._socket.close()
+                raise
+        else:
+            self._socket = socket.create_connection((host, port))
+            self._socket.setsockopt(
+                socket.IPPROTO_TCP, socket.TCP_NODELAY, True)
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(
+            self,
+            exc_type: Optional[Type[BaseException]],
+            exc_val: Optional[Exception],
+            exc_tb: Optional[TracebackType],
+    ) -> bool:
+        self.close()
+        return False
+
+    def close(self) -> None:
+        self._socket.close()
+
+    def _send(self, command: int, data: bytes) -> None:
+        if len(data) > MAX_DATA:
+            raise ValueError("Messages are limited to {} bytes".format(
+                MAX_DATA))
+        self._socket.sendall(HEADER.pack(CHANNEL, command, len(data)) + data)
+
+    def set_pixels(self, rgb: bytes) -> None:
+        """Set the colors of the first leds (OPC, three bytes per led)"""
+        self._send(SET_PIXELS, bytes(rgb))
+
+    def set_state(self, state: bytes, offset: int=0) -> None:
+        """Set the packed state (see `Array.dump`) of leds from `offset`"""
+        self._send(SYSTEM_EXCLUSIVE,
+                   SYSTEM_HEADER.pack(SYSTEM_ID, SET_STATE, offset) + state)
+
+    def set(
+            self,
+            colors: Sequence[Color],
+            brightness: Union[float, Sequence[float]]=1.0,
+            offset: int=0,
+    ) -> None:
+        """
+        Set the color and brightness of `len(colors)` leds from `offset`
+
+        `brightness` is either a single value for every led or one per led.
+        """
+        if isinstance(brightness, (int, float)):
+            brightness = [brightness] * len(colors)
+        if len(brightness) != len(colors):
+            raise ValueError("Expected {} brightness values".format(
+                len(colors)))
+        state = bytearray(LED_SIZE * len(colors))
+        state[BRIGHTNESS::LED_SIZE] = bytes(map(_quantize, brightness))
+        for channel, attribute in ((BLUE, 'b'), (GREEN, 'g'), (RED, 'r')):
+            state[channel::LED_SIZE] = bytes(int(getattr(color, attribute))
+                                             for color in colors)
+        self.set_state(bytes(state), offset)
@@ -0,0 +1,343 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from collections import OrderedDict
+from math import cos, pi
+from threading import Lock
+from typing import Any, Dict, Hashable, Iterator, Optional
+
+from .colors import Color, hsv_to_rgb8
+from .leds import Array, BLUE, BRIGHTNESS, GREEN, LED_SIZE, RED, _quantize
+
+BUDGET = 4 * 1024 * 1024
+
+
+def _pack(rgb: bytes, levels: bytes) -> bytes:
+    """Packed state (see `Array.dump`) of RGB triples and brightness levels"""
+    state = bytearray(len(levels) * LED_SIZE)
+    state[BRIGHTNESS::LED_SIZE] = levels
+    state[RED::LED_SIZE] = rgb[0::3]
+    state[GREEN::LED_SIZE] = rgb[1::3]
+    state[BLUE::LED_SIZE] = rgb[2::3]
+    return bytes(state)
+
+
+def _rgb(color: Color) -> bytes:
+    return bytes((int(color.r), int(color.g), int(color.b)))
+
+
+def _hashable(value: Any) -> Hashable:
+    if isinstance(value, Color):
+        return int(value.r), int(value.g), int(value.b)
+    return value
+
+
+class Compiled:
+    """
+    Every frame of one period of an effect, stored contiguously with the
+    packed state layout of `Array.dump`
+
+    Replaying it only copies each frame into the leds, with no color math.
+    """
+
+    __slots__ = ('_num_leds', '_data')
+
+    def __init__(self, num_leds: int, data: bytes) -> None:
+        if not data or len(data) % (num_leds * LED_SIZE):
+            raise ValueError("Expected whole frames of {} leds".format(
+                num_leds))
+        self._num_leds = num_leds
+        self._data = data
+
+    def __str__(self) -> str:
+        return "<Compiled frames={} leds={}>".format(len(self), self._num_leds)
+
+    def __len__(self) -> int:
+        return len(self._data) // (self._num_leds * LED_SIZE)
+
+    def __getitem__(self, index: int) -> bytes:
+        """Packed state of a frame"""
+        size = self._num_leds * LED_SIZE
+        if not -len(self) <= index < len(self):
+            raise IndexError("frame index out of range")
+        offset = index % len(self) * size
+        return self._data[offset:offset + size]
+
+    @property
+    def num_leds(self) -> int:
+        return self._num_leds
+
+    @property
+    def size(self) -> int:
+        """Memory taken by the frames, in bytes"""
+        return len(self._data)
+
+    def replay(self, leds: Array, loop: bool=True) -> Iterator[int]:
+        """
+        Iterator that loads the next frame into `leds` every time it is
+        advanced, yielding its index, so it can be used as the producer of a
+        `Scheduler`:
+
+            board.schedule(30, effects.Rainbow().replay(board.leds))
+        """
+        if len(leds) != self._num_leds:
+            raise ValueError("The effect was compiled for {} leds".format(
+                self._num_leds))
+        data = self._data
+        size = self._num_leds * LED_SIZE
+        while True:
+            for index, offset in enumerate(range(0, len(data), size)):
+                leds.load(data[offset:offset + size])
+                yield index
+            if not loop:
+                return
+
+
+class EffectCache:
+    """
+    Compiled effects, keyed by the parameters of the effect and the number of
+    leds, evicting the least recently used ones to keep their total size
+    within `budget` bytes
+    """
+
+    __slots__ = ('_budget', '_entries', '_size', '_lock', '_hits',
+                 '_misses')
+
+    def __init__(self, budget: int=BUDGET) -> None:
+        self._budget = budget
+        self._entries = OrderedDict()  # type: Dict[Hashable, Compiled]
+        self._size = 0
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __str__(self) -> str:
+        return "<EffectCache effects={} size={}/{}>".format(
+            len(self), self._size, self._budget)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def budget(self) -> int:
+        """Maximum total size of the compiled effects, in bytes"""
+        return self._budget
+
+    @budget.setter
+    def budget(self, value: int) -> None:
+        with self._lock:
+            self._budget = value
+            self._evict()
+
+    @property
+    def size(self) -> int:
+        """Total size of the compiled effects, in bytes"""
+        return self._size
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def get(self, effect: "Effect", num_leds: int) -> Compiled:
+        """Compiled `effect` for `num_leds` leds, compiling it on a miss"""
+        key = (effect.key, num_leds)
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return compiled
+            self._misses += 1
+
+        # Out of the lock, other effects can be served meanwhile
+        compiled = effect.compile(num_leds)
+        with self._lock:
+            if key not in self._entries and compiled.size <= self._budget:
+                self._entries[key] = compiled
+                self._size += compiled.size
+                self._evict()
+        return compiled
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _evict(self) -> None:
+        # Must be called with the lock held
+        while self._size > self._budget:
+            _, compiled = self._entries.popitem(last=False)
+            self._size -= compiled.size
+
+
+# Cache used by `Effect.replay`
+CACHE = EffectCache()
+
+
+class Effect:
+    """
+    Periodic animation described by its parameters
+
+    `frames` generates the packed state of every frame of one period for a
+    chain of a given length. As effects are periodic, the period is compiled
+    once and replayed from a cache keyed by the parameters.
+    """
+
+    __slots__ = ()
+
+    def __str__(self) -> str:
+        return "<{} {}>".format(type(self).__name__, " ".join(
+            "{}={}".format(name.lstrip('_'), getattr(self, name))
+            for name in self.__slots__))
+
+    @property
+    def key(self) -> Hashable:
+        """Parameters that identify the frames of the effect"""
+        return (type(self),) + tuple(_hashable(getattr(self, name))
+                                     for name in self.__slots__)
+
+    def frames(self, num_leds: int) -> Iterator[bytes]:
+        """Packed state of every frame of one period"""
+        raise NotImplementedError
+
+    def compile(self, num_leds: int) -> Compiled:
+        """Every frame of one period, bypassing any cache"""
+        return Compiled(num_leds, b''.join(self.frames(num_leds)))
+
+    def replay(
+            self,
+            leds: Array,
+            loop: bool=True,
+            cache: Optional[EffectCache]=None,
+    ) -> Iterator[int]:
+        """`Compiled.replay` of the effect from `cache`, `CACHE` by default"""
+        cache = CACHE if cache is None else cache
+        return cache.get(self, len(leds)).replay(leds, loop)
+
+
+class Rainbow(Effect):
+    """Hue cycle over `steps` frames, spreading `spread` cycles on the leds"""
+
+    __slots__ = ('_steps', '_spread', '_brightness')
+
+    def __init__(
+            self,
+            steps: int=256,
+            spread: float=1.0,
+            brightness: float=1.0,
+    ) -> None:
+        self._steps = steps
+        self._spread = spread
+        self._brightness = brightness
+
+    def frames(self, num_leds: int) -> Iterator[bytes]:
+        levels = bytes((_quantize(self._brightness),)) * num_leds
+        for step in range(self._steps):
+            hues = [(step / self._steps + i * self._spread / num_leds) % 1.0
+                    for i in range(num_leds)]
+            yield _pack(hsv_to_rgb8(hues, 1.0, 1.0), levels)
+
+
+class Breathe(Effect):
+    """Every led fading in and out of `color` over `steps` frames"""
+
+    __slots__ = ('_color', '_steps', '_minimum', '_maximum')
+
+    def __init__(
+            self,
+            color: Color=Color(255, 255, 255),
+            steps: int=64,
+            minimum: float=0.0,
+            maximum: float=1.0,
+    ) -> None:
+        self._color = color
+        self._steps = steps
+        self._minimum = minimum
+        self._maximum = maximum
+
+    def frames(self, num_leds: int) -> Iterator[bytes]:
+        rgb = _rgb(self._color) * num_leds
+        amplitude = self._maximum - self._minimum
+        for step in range(self._steps):
+            phase = (1 - cos(2 * pi * step / self._steps)) / 2
+            level = _quantize(self._minimum + amplitude * phase)
+            yield _pack(rgb, bytes((level,)) * num_leds)
+
+
+class Chase(Effect):
+    """`length` leds of `color` running over the `background`"""
+
+    __slots__ = ('_color', '_length', '_background', '_brightness')
+
+    def __init__(
+            self,
+            color: Color=Color(255, 255, 255),
+            length: int=1,
+            background: Color=Color(),
+            brightness: float=1.0,
+    ) -> None:
+        self._color = color
+        self._length = length
+        self._background = background
+        self._brightness = brightness
+
+    def frames(self, num_leds: int) -> Iterator[bytes]:
+        levels = bytes((_quantize(self._brightness),)) * num_leds
+        color = _rgb(self._color)
+        background = _rgb(self._background)
+        for step in range(num_leds):
+            yield _pack(b''.join(
+                color if (i - step) % num_leds < self._length else background
+                for i in range(num_leds)), levels)
+
+
+class Scanner(Effect):
+    """
+    Light of `color` bouncing between both ends, fading over `width` leds on
+    each side
+    """
+
+    __slots__ = ('_color', '_width', '_brightness')
+
+    def __init__(
+            self,
+            color: Color=Color(255, 0, 0),
+            width: int=2,
+            brightness: float=1.0,
+    ) -> None:
+        self._color = color
+        self._width = width
+        self._brightness = brightness
+
+    def frames(self, num_leds: int) -> Iterator[bytes]:
+        rgb = _rgb(self._color) * num_leds
+        positions = list(range(num_leds)) + list(range(num_leds - 2, 0, -1))
+        for position in positions:
+            yield _pack(rgb, bytes(
+                _quantize(self._brightness * max(
+                    0.0, 1 - abs(i - position) / (self._width + 1)))
+                for i in range(num_leds)))
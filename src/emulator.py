@@ -0,0 +1,243 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .encoder import LED_HEADER
+from .errors import DisplayError
+from .gpio import CLOCK_CHANNEL, DATA_CHANNEL
+from .leds import NUM_LEDS
+from .transport import Transport
+
+START_FRAME_BITS = 32
+WORD_BITS = 32
+HEADER_MASK = 0b11100000 << 24
+
+# (brightness, blue, green, red), as in the led frames
+State = Tuple[int, int, int, int]
+
+
+class Chain:
+    """
+    Bit level model of a chain of APA102 leds
+
+    Bits are clocked in one at a time. After a start frame (32 zero bits) the
+    following 32-bit words are led frames for consecutive leds. As every led
+    delays the data half a clock cycle, the frame of the led at index `i` is
+    only latched after (i + 1) // 2 additional clock pulses.
+
+    Protocol errors are collected in `errors`: led frames without the 111
+    header bits, and frames still waiting for clock pulses when a transfer
+    ends (short end frame), which would be latched late by the next transfer.
+    """
+
+    __slots__ = ('_leds', '_errors', '_clocks', '_zeros', '_index', '_word',
+                 '_bits', '_pending', '_latched')
+
+    def __init__(self, num_leds: int=NUM_LEDS) -> None:
+        self._leds = [(0, 0, 0, 0)] * num_leds  # type: List[State]
+        self._errors = []  # type: List[str]
+        self._clocks = 0
+        self._zeros = 0
+        self._index = None  # type: Optional[int]
+        self._word = 0
+        self._bits = 0
+        # (clock deadline, led index, state) waiting to be latched
+        self._pending = deque()  # type: Deque[Tuple[int, int, State]]
+        self._latched = 0
+
+    def __len__(self) -> int:
+        return len(self._leds)
+
+    @property
+    def leds(self) -> Tuple[State, ...]:
+        """Latched (brightness, blue, green, red) of every led"""
+        return tuple(self._leds)
+
+    @property
+    def errors(self) -> List[str]:
+        """Protocol errors found so far"""
+        return self._errors
+
+    @property
+    def latched(self) -> int:
+        """Number of led frames latched so far"""
+        return self._latched
+
+    def clock(self, bit: bool) -> None:
+        """Rising clock edge with `bit` on the data line"""
+        self._clocks += 1
+        pending = self._pending
+        while pending and pending[0][0] <= self._clocks:
+            _, index, state = pending.popleft()
+            self._leds[index] = state
+            self._latched += 1
+
+        if bit:
+            self._zeros = 0
+        else:
+            self._zeros += 1
+            if self._zeros >= START_FRAME_BITS:
+                # Start frame: the next word with a leading one is for led 0
+                self._index = 0
+                self._bits = 0
+                return
+            if self._index is None or self._bits == 0:
+                # Waiting for a start frame or for the first led frame
+                return
+
+        if self._index is None:
+            return
+        self._word = (self._word << 1) | bit
+        self._bits += 1
+        if self._bits == WORD_BITS:
+            self._frame(self._word)
+            self._word = 0
+            self._bits = 0
+
+    def _frame(self, word: int) -> None:
+        index = self._index
+        self._index += 1
+        if index >= len(self._leds):
+            # Forwarded past the end of the chain
+            return
+        if word & HEADER_MASK != HEADER_MASK:
+            self._errors.append(
+                "Led {}: bad header bits {:03b}".format(index, word >> 29))
+            return
+        state = ((word >> 24) & ~LED_HEADER & 0xFF, (word >> 16) & 0xFF,
+                 (word >> 8) & 0xFF, word & 0xFF)
+        self._pending.append((self._clocks + (index + 1) // 2, index, state))
+
+    def feed(self, data: bytes) -> None:
+        """Clock in `data`, most significant bit first"""
+        clock = self.clock
+        for byte in data:
+            for i in range(7, -1, -1):
+                clock((byte >> i) & 1)
+
+    def end(self) -> None:
+        """Mark the end of a transfer, checking that every frame latched"""
+        for _, index, _ in self._pending:
+            self._errors.append(
+                "Led {}: short end frame, not latched".format(index))
+
+
+class EmulatorTransport(Transport):
+    """
+    Transport that decodes the frames with an emulated APA102 chain
+
+    It needs no hardware, so boards can be tested and profiled anywhere. If
+    `strict` is set, protocol errors raise `DisplayError`.
+    """
+
+    __slots__ = ('_chain', '_strict', '_frames')
+
+    def __init__(self, num_leds: int=NUM_LEDS, strict: bool=False) -> None:
+        self._chain = Chain(num_leds)
+        self._strict = strict
+        self._frames = 0
+
+    def __str__(self) -> str:
+        return "<EmulatorTransport leds={}>".format(len(self._chain))
+
+    @classmethod
+    def create(cls, num_leds: int) -> "EmulatorTransport":
+        return cls(num_leds)
+
+    @property
+    def chain(self) -> Chain:
+        return self._chain
+
+    @property
+    def frames(self) -> int:
+        """Number of frames written"""
+        return self._frames
+
+    def write(self, frame: bytes) -> None:
+        errors = len(self._chain.errors)
+        self._chain.feed(frame)
+        self._chain.end()
+        self._frames += 1
+        if self._strict and len(self._chain.errors) > errors:
+            raise DisplayError("; ".join(self._chain.errors[errors:]))
+
+
+class EmulatedGPIO:
+    """
+    Stand-in for the `RPi.GPIO` module that drives an emulated chain
+
+    Every rising edge on the clock channel clocks the level of the data
+    channel into the chain. Pass it to `GPIOTransport` as `gpio`. As bit-banged
+    transfers have no explicit end, call `chain.end()` to check for short end
+    frames.
+    """
+
+    BOARD = 10
+    BCM = 11
+    OUT = 0
+    IN = 1
+
+    __slots__ = ('_chain', '_data', '_clock', '_levels', '_mode')
+
+    def __init__(
+            self,
+            num_leds: int=NUM_LEDS,
+            data: int=DATA_CHANNEL,
+            clock: int=CLOCK_CHANNEL,
+    ) -> None:
+        self._chain = Chain(num_leds)
+        self._data = data
+        self._clock = clock
+        self._levels = {}  # type: Dict[int, bool]
+        self._mode = None  # type: Optional[int]
+
+    @property
+    def chain(self) -> Chain:
+        return self._chain
+
+    def setmode(self, mode: int) -> None:
+        self._mode = mode
+
+    def setwarnings(self, flag: bool) -> None:
+        pass
+
+    def setup(self, channel: int, direction: int) -> None:
+        self._levels[channel] = False
+
+    def output(self, channel: int, value: bool) -> None:
+        if channel not in self._levels:
+            raise RuntimeError("Channel {} is not set up".format(channel))
+        value = bool(value)
+        if (channel == self._clock and value and
+                not self._levels[channel]):
+            self._chain.clock(self._levels.get(self._data, False))
+        self._levels[channel] = value
+
+    def cleanup(self, channels=None) -> None:
+        if channels is None:
+            self._levels.clear()
+        else:
+            for channel in channels:
+                self._levels.pop(channel, None)
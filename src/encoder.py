@@ -0,0 +1,106 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from typing import Optional, TYPE_CHECKING
+
+from .leds import Array, BLUE, BRIGHTNESS, GREEN, LED_SIZE, MAX_BRIGHTNESS, RED
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .correction import Correction
+
+START_FRAME_SIZE = 4
+LED_FRAME_SIZE = LED_SIZE
+LED_HEADER = 0b11100000
+
+
+def end_frame_size(num_leds: int) -> int:
+    """
+    Number of bytes of the end frame for a chain of `num_leds` leds
+
+    Each led delays the data signal half a clock cycle, so (n + 1) // 2 extra
+    clock pulses are needed for the last led frame to reach its destination.
+
+    The end frame is made of zeros: when only the first leds of a chain are
+    updated, the end frame reaches the next led, which would take a word of
+    ones as a full white led frame while a word of zeros is a start frame.
+    """
+    return ((num_leds + 1) // 2 + 7) // 8
+
+
+def wrap(leds: bytes) -> bytes:
+    """Returns the complete frame for already encoded led frames"""
+    return (bytes(START_FRAME_SIZE) + leds +
+            bytes(end_frame_size(len(leds) // LED_FRAME_SIZE)))
+
+
+class Encoder:
+    """
+    APA102 frame encoder
+
+    Builds the complete frame (start frame, led frames and end frame) out of
+    the packed state of an `Array`, which already has the layout of the led
+    frames. Only the header bits have to be added to the brightness bytes,
+    which is done for the whole frame at once through a translation table.
+
+    If a `Correction` is provided, its tables are applied the same way to
+    every byte of the led frames.
+    """
+
+    __slots__ = ('_headers', '_correction')
+
+    def __init__(self, correction: Optional["Correction"]=None) -> None:
+        # First byte: 1110 0000 | brightness (000x xxxx) = 111x xxxx
+        self._headers = bytes(LED_HEADER | min(value, MAX_BRIGHTNESS)
+                              for value in range(256))
+        self._correction = correction
+
+    @property
+    def correction(self) -> Optional["Correction"]:
+        return self._correction
+
+    def encode_leds(self, state: bytes) -> bytes:
+        """Returns the led frames for a packed state (see `Array.dump`)"""
+        leds = bytearray(len(state))
+        if self._correction is None:
+            leds[:] = state
+            leds[BRIGHTNESS::LED_FRAME_SIZE] = \
+                state[BRIGHTNESS::LED_SIZE].translate(self._headers)
+        else:
+            for byte, table in zip((BRIGHTNESS, BLUE, GREEN, RED),
+                                   self._correction.tables):
+                leds[byte::LED_FRAME_SIZE] = \
+                    state[byte::LED_SIZE].translate(table)
+        return bytes(leds)
+
+    def encode_state(self, state: bytes) -> bytes:
+        """Returns the frame for a packed state (see `Array.dump`)"""
+        return wrap(self.encode_leds(state))
+
+    def encode(self, array: Array, num_leds: Optional[int]=None) -> bytes:
+        """
+        Returns the frame that represents the current state of `array`
+
+        If `num_leds` is provided, only the first `num_leds` leds are included
+        in the frame and the rest of the chain keeps its previous state.
+        """
+        return self.encode_state(array.dump(num_leds))
@@ -0,0 +1,81 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from typing import Optional, Tuple
+
+from .colors import Color
+from .leds import BLUE, BRIGHTNESS, GREEN, LED_SIZE, MAX_BRIGHTNESS, RED
+from .leds import _changed
+
+
+class Frame(bytes):
+    """
+    Immutable snapshot of the state of a sequence of leds
+
+    It holds the packed state of `Array.dump`, four bytes per led, so it is
+    compact, hashable and compared as bytes, and it is applied back to an
+    array with a single bulk write (see `Array.restore`). Colors and
+    brightness levels come from the same snapshot, so they always agree.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, state: bytes=b'') -> "Frame":
+        if len(state) % LED_SIZE:
+            raise ValueError("The state size is not a multiple of {}".format(
+                LED_SIZE))
+        return super().__new__(cls, state)
+
+    def __str__(self) -> str:
+        return "<Frame leds={}>".format(self.num_leds)
+
+    @property
+    def num_leds(self) -> int:
+        return len(self) // LED_SIZE
+
+    @property
+    def color(self) -> Tuple[Color, ...]:
+        return tuple(Color(r, g, b) for r, g, b in zip(
+            self[RED::LED_SIZE], self[GREEN::LED_SIZE], self[BLUE::LED_SIZE]))
+
+    @property
+    def brightness(self) -> Tuple[float, ...]:
+        return tuple(value / MAX_BRIGHTNESS
+                     for value in self[BRIGHTNESS::LED_SIZE])
+
+    def diff(
+            self,
+            other: bytes,
+            num_leds: Optional[int]=None,
+    ) -> Tuple[int, ...]:
+        """
+        Indexes of the leds whose state differs in `other`, among the first
+        `num_leds` (all by default)
+        """
+        if len(other) != len(self):
+            raise ValueError("Frames of different lengths can not be compared")
+        if num_leds is None:
+            num_leds = self.num_leds
+            if self == other:
+                return ()
+        return tuple(_changed(self, other, min(num_leds, self.num_leds)))
@@ -0,0 +1,123 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from time import perf_counter_ns
+from typing import Any, Optional
+
+from .timing import Calibrated, Timing
+from .transport import Transport
+
+DATA_CHANNEL = 16
+CLOCK_CHANNEL = 18
+CLOCK_PERIOD = 0.000001
+
+# Bits of every byte, most significant first
+_BITS = tuple(tuple(bool((byte >> i) & 1) for i in range(7, -1, -1))
+              for byte in range(256))
+
+
+class GPIOTransport(Transport):
+    """
+    Bit-banged transport through two GPIO channels
+
+    Every clock edge is a Python call, so this is the slowest transport, but
+    it works with any pair of pins. The clock edges are paced by a `Timing`
+    strategy, by default calibrated at setup to never exceed the frequency of
+    a clock with the given `period`.
+
+    Pins are driven through `RPi.GPIO`, which is imported when the transport
+    is opened, unless another module with the same interface is provided as
+    `gpio` (e.g. an `emulator.EmulatedGPIO`). Channels use board numbering.
+    """
+
+    __slots__ = ('_data', '_clock', '_timing', '_gpio', '_bit_rate')
+
+    def __init__(
+            self,
+            data: int=DATA_CHANNEL,
+            clock: int=CLOCK_CHANNEL,
+            period: float=CLOCK_PERIOD,
+            timing: Optional[Timing]=None,
+            gpio: Optional[Any]=None,
+    ) -> None:
+        self._data = data
+        self._clock = clock
+        self._timing = Calibrated(1 / period) if timing is None else timing
+        self._gpio = gpio
+        self._bit_rate = None  # type: Optional[float]
+
+    def __str__(self) -> str:
+        return "<GPIOTransport data={} clock={} timing={}>".format(
+            self._data, self._clock, self._timing)
+
+    @property
+    def timing(self) -> Timing:
+        """Strategy that paces the clock edges"""
+        return self._timing
+
+    @property
+    def bit_rate(self) -> Optional[float]:
+        """Bits per second achieved by the last write"""
+        return self._bit_rate
+
+    def open(self) -> None:
+        if self._gpio is None:
+            import RPi.GPIO
+            self._gpio = RPi.GPIO
+        gpio = self._gpio
+        gpio.setmode(gpio.BOARD)
+        gpio.setwarnings(False)
+        gpio.setup(self._data, gpio.OUT)
+        gpio.setup(self._clock, gpio.OUT)
+        # Calibration sends zeros, which are taken as a start frame
+        self._timing.calibrate(self.write)
+        self._bit_rate = None
+
+    def close(self) -> None:
+        self._gpio.cleanup((self._data, self._clock))
+
+    def write(self, frame: bytes) -> None:
+        output = self._gpio.output
+        data = self._data
+        clock = self._clock
+        delay = self._timing.delay()
+
+        start = perf_counter_ns()
+        if delay is None:
+            for byte in frame:
+                for bit in _BITS[byte]:
+                    output(data, bit)
+                    output(clock, True)
+                    output(clock, False)
+        else:
+            for byte in frame:
+                for bit in _BITS[byte]:
+                    output(data, bit)
+                    output(clock, True)
+                    delay()
+                    output(clock, False)
+                    delay()
+        elapsed = perf_counter_ns() - start
+
+        if elapsed:
+            self._bit_rate = 8e9 * len(frame) / elapsed
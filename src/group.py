@@ -0,0 +1,221 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from threading import BrokenBarrierError, Barrier, Lock
+from time import perf_counter_ns, sleep
+from types import TracebackType
+from typing import (
+    Any, Dict, Iterable, List, Optional, Tuple, Type, TYPE_CHECKING)
+
+from .board import Board
+from .stats import Histogram
+
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import ThreadPoolExecutor
+
+
+class BoardGroup:
+    """
+    Several boards displayed together
+
+    Each board keeps its own leds, number of leds and transport (e.g. a
+    `GPIOTransport` on its own pins). `display` encodes the frames of every
+    board and then sends them concurrently from a pool with a worker per
+    board, so the frames are latched together instead of one after another.
+
+    Transports take different times to send frames of different lengths. With
+    `align` set, the shorter transmissions are delayed, from the rate measured
+    in the previous ones, so all the boards latch as close together as
+    possible. The remaining difference, the `skew`, is measured every time.
+    Transmissions only overlap with transports that release the GIL while
+    writing (e.g. `SPITransport`): bit-banged ones are better not aligned.
+
+    It acts as a context manager, setting up all the boards.
+    """
+
+    __slots__ = ('_boards', '_align', '_lock', '_executor', '_rates',
+                 '_skew', '_last_skew')
+
+    def __init__(self, boards: Iterable[Board], align: bool=True) -> None:
+        self._boards = tuple(boards)
+        if len(set(map(id, self._boards))) != len(self._boards):
+            raise ValueError("Boards can only be grouped once")
+        self._align = align
+        self._lock = Lock()
+        self._executor = None  # type: Optional[ThreadPoolExecutor]
+        # Nanoseconds per byte of the last transmission of each board
+        self._rates = [None] * len(self._boards)  # type: List[Optional[float]]
+        self._skew = Histogram()
+        self._last_skew = None  # type: Optional[float]
+
+    def __str__(self) -> str:
+        return "<BoardGroup {}>".format(
+            " ".join(str(board) for board in self._boards))
+
+    def __enter__(self) -> "BoardGroup":
+        """Setup all the boards"""
+        entered = []  # type: List[Board]
+        try:
+            for board in self._boards:
+                board.__enter__()
+                entered.append(board)
+        except BaseException:
+            for board in reversed(entered):
+                board.__exit__(None, None, None)
+            raise
+        return self
+
+    def __exit__(
+            self,
+            exc_type: Optional[Type[BaseException]],
+            exc_val: Optional[Exception],
+            exc_tb: Optional[TracebackType],
+    ) -> bool:
+        """Cleanup all the boards and the workers"""
+        try:
+            for board in reversed(self._boards):
+                board.__exit__(exc_type, exc_val, exc_tb)
+        finally:
+            self.close()
+        return False
+
+    @property
+    def boards(self) -> Tuple[Board, ...]:
+        return self._boards
+
+    @property
+    def align(self) -> bool:
+        """Delay the shorter transmissions to latch all the boards together"""
+        return self._align
+
+    @align.setter
+    def align(self, value: bool) -> None:
+        self._align = value
+
+    @property
+    def last_skew(self) -> Optional[float]:
+        """
+        Seconds between the first and the last board latching a frame in the
+        last `display`, or None if less than two boards sent a frame
+        """
+        return self._last_skew
+
+    @property
+    def skew(self) -> Dict[str, Any]:
+        """Histogram of the skews, in seconds (see `last_skew`)"""
+        with self._lock:
+            return self._skew.snapshot()
+
+    def close(self) -> None:
+        """Stop the workers, they are started again when needed"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def _worker(self) -> "ThreadPoolExecutor":
+        # Must be called with the lock held
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(
+                max_workers=len(self._boards),
+                thread_name_prefix="blinkt-group")
+        return self._executor
+
+    def display(self, force: bool=False) -> None:
+        """
+        Copy the virtual `leds` state of every board to the physical boards
+
+        As `Board.display`, only the changed leds of each board are sent, and
+        `force` sends the whole frames. Boards that are not set up are left
+        out.
+        """
+        with self._lock:
+            count = len(self._boards)
+            barrier = Barrier(count)
+            estimates = [0] * count
+            futures = [
+                self._worker().submit(self._display, index, barrier,
+                                      estimates, force)
+                for index in range(count)
+            ]
+            ends = [future.result() for future in futures]
+
+            ends = [end for end in ends if end is not None]
+            if len(ends) > 1:
+                skew = max(ends) - min(ends)
+                self._skew.add(skew)
+                self._last_skew = skew / 1e9
+            else:
+                self._last_skew = None
+
+    def _display(
+            self,
+            index: int,
+            barrier: Barrier,
+            estimates: List[int],
+            force: bool,
+    ) -> Optional[int]:
+        """
+        Display a board in step with the rest (in a worker)
+
+        Returns when the frame finished sending, or None if nothing was sent.
+        """
+        board = self._boards[index]
+        start = perf_counter_ns()
+        with board._lock:
+            locked = perf_counter_ns()
+            active = board._counter > 0
+            try:
+                prepared = board._prepare(force) if active else None
+            except BaseException:
+                # Do not leave the other boards waiting
+                barrier.abort()
+                raise
+
+            if prepared is not None and self._rates[index] is not None:
+                estimates[index] = int(self._rates[index] * len(prepared[0]))
+            try:
+                barrier.wait()
+            except BrokenBarrierError:
+                # Another board failed, its error is the one raised
+                return None
+            if prepared is None:
+                result = end = None
+            else:
+                if self._align:
+                    # Yield while waiting, other boards are being sent
+                    deadline = perf_counter_ns() + max(estimates) - \
+                        estimates[index]
+                    while perf_counter_ns() < deadline:
+                        sleep(0)
+                transmit = board._commit(prepared)
+                end = perf_counter_ns()
+                frame, num_leds, _, _, encode = prepared
+                self._rates[index] = transmit / len(frame)
+                result = num_leds, len(frame), encode, transmit
+
+        # Out of the lock, as hooks may take their time
+        if active:
+            board._report(start, locked, result)
+        return end
@@ -21,43 +21,169 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
-from itertools import cycle
-from threading import RLock, Lock
+import sys
+from contextlib import contextmanager
+from itertools import count, islice
+from struct import Struct
+from threading import Condition, get_ident
+from time import perf_counter_ns, sleep
 from types import TracebackType
-from typing import Optional, Sequence, Tuple, Type, Union
+from weakref import finalize, ref
+from typing import (
+    Any, Callable, Iterable, Iterator, List, Optional, Sequence, Set, Tuple,
+    Type, Union, TYPE_CHECKING)
 
-from .colors import Color
-from .singleton import Singleton
+from .colors import Color, _numpy
+from .errors import SharedStateError
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .frame import Frame
 
 NUM_LEDS = 8
 MAX_BRIGHTNESS = 31
 
+# Packed state layout: (brightness, blue, green, red) per led
+LED_SIZE = 4
+BRIGHTNESS, BLUE, GREEN, RED = range(LED_SIZE)
+
+# Shared memory segment header: magic, number of leds, sequence counter and
+# flags
+SHARED_HEADER = Struct('<4sIQI4x')
+SHARED_MAGIC = b'BLKS'
+_SEQUENCE = Struct('<Q')
+_SEQUENCE_OFFSET = 8
+_FLAGS = Struct('<I')
+_FLAGS_OFFSET = 16
+# Flag set once a process exposed NumPy views, whose writes are not sequenced
+_VIEWED = 1
+# Nanoseconds a write of the shared state may last before giving up reading
+READ_TIMEOUT = 1000000000
+
+# Source of change generations, shared by every led
+_generations = count(1)
+
+
+def _no_exception(
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[Exception],
+        exc_tb: Optional[TracebackType],
+) -> bool:
+    return all(map(lambda x: x is None, (exc_type, exc_val, exc_tb)))
+
+
+def _tile(pattern: bytes, length: int) -> bytes:
+    """Repeat `pattern` cyclically up to `length` bytes"""
+    return (pattern * (length // len(pattern) + 1))[:length]
+
+
+# Brightness levels clamped to the maximum
+_CLAMP = bytes(min(value, MAX_BRIGHTNESS) for value in range(256))
+
+
+def _changed(old: bytes, new: bytes, num_leds: int) -> List[int]:
+    """Indexes of the first `num_leds` leds whose packed state differs"""
+    # Importing NumPy takes longer than comparing any chain, it is only used
+    # if it was already imported (e.g. for the views)
+    np = sys.modules.get('numpy')
+    if np is None:
+        return [i for i in range(num_leds)
+                if old[i * LED_SIZE:(i + 1) * LED_SIZE] !=
+                new[i * LED_SIZE:(i + 1) * LED_SIZE]]
+    size = num_leds * LED_SIZE
+    old = np.frombuffer(old, dtype=np.uint8, count=size)
+    new = np.frombuffer(new, dtype=np.uint8, count=size)
+    return np.flatnonzero(
+        (old != new).reshape(num_leds, LED_SIZE).any(axis=1)).tolist()
+
+
+# Names of the shared memory segments created by this process
+_created = set()  # type: Set[str]
+
+
+def _attach(name: str) -> Any:
+    """Attach to an existing shared memory segment without owning it"""
+    from multiprocessing import parent_process, shared_memory
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        pass
+    # Before Python 3.13 attaching registers the segment to be removed when
+    # the resource tracker exits. Processes started by multiprocessing share
+    # the tracker of their parent, any other one has to unregister it.
+    memory = shared_memory.SharedMemory(name)
+    if parent_process() is None and memory.name not in _created:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(memory._name, 'shared_memory')
+    return memory
+
+
+def _detach(memory: Any, state: memoryview, creator: bool) -> None:
+    """Close a shared memory segment, removing it if it was created here"""
+    try:
+        state.release()
+        memory.close()
+    except BufferError:
+        # Only at exit, with views still exported: the mapping goes with the
+        # process, but the segment must still be removed
+        pass
+    if creator:
+        memory.unlink()
+        _created.discard(memory.name)
+
+
+def _quantize(value: float) -> int:
+    """Brightness level of a value in the range 0..1"""
+    # Check boundaries
+    value = 1.0 if value >= 1.0 else 0.0 if value <= 0.0 else value
+    return int(value * MAX_BRIGHTNESS)
+
+
+class Array(tuple):
+    """
+    Sequence of leds backed by a single packed buffer
+
+    The state of every led is stored in a single `bytearray` guarded by a
+    single lock, so bulk reads and writes only need one lock acquisition. Led
+    objects are lightweight views over that buffer. Bulk writes are done with
+    slice assignments, so their cost in Python does not grow with the number
+    of leds, only with the length of the provided sequence.
+
+    Ownership is tracked per led with the owner thread and the number of times
+    it was acquired, so claiming several leds is a single atomic operation.
+    Slicing the array with a step of 1 returns a `Range` of contiguous leds
+    which claims them all at once, other slices return tuples of leds.
+    If `on_wait` is set, it is called with the range of leds and the
+    nanoseconds spent waiting for leds owned by other threads.
+
+    The packed state can also be exposed as NumPy arrays without copies. As
+    writes through them can not be intercepted, once they are exposed the
+    changes are found by comparing the state with a copy of it.
+
+    The state can be placed in a shared memory segment (see `shared`) that
+    other processes `attach` to and write directly, without serializing
+    anything. Writes are bracketed by a sequence counter in the segment which
+    is odd while a write is in progress (a seqlock), so readers take
+    consistent copies and only compare the state when the counter moved, or
+    always once any process exposed views outside `vectorized`, as writes
+    through them do not move it. The counter only supports one writing
+    process at a time.
+    """
 
-class _Tuple(tuple):
-    """Adapter class that removes keyword-arguments from __init_subclass__"""
-    def __init_subclass__(cls, **kwargs):
-        """Remove keyword-arguments as tuple do not accept them"""
-        return super().__init_subclass__()
-
-
-class Array(_Tuple, metaclass=Singleton):
     class Led:
-        __slots__ = ('_color', '_brightness', '_lock', '_ownership')
+        __slots__ = ('_array', '_index')
 
-        def __init__(self) -> None:
-            self._color = Color()
-            self._brightness = MAX_BRIGHTNESS // 2
-            self._lock = Lock()
-            self._ownership = RLock()
+        def __init__(self, index: int) -> None:
+            self._array = None  # type: Optional[Array]
+            self._index = index
 
         def __str__(self) -> str:
-            with self._lock:
-                return "<Led color={} brightness={}/{}>".format(
-                    self._color, self._brightness, MAX_BRIGHTNESS)
+            color, brightness = self.all
+            return "<Led color={} brightness={}/{}>".format(
+                color, brightness, MAX_BRIGHTNESS)
 
         def __enter__(self) -> "Array.Led":
             # Initialization
-            self._ownership.acquire()
+            self._array._acquire(self._index, self._index + 1)
 
             # Return itself
             return self
@@ -69,10 +195,10 @@ class Array(_Tuple, metaclass=Singleton):
                 exc_tb: Optional[TracebackType],
         ) -> bool:
             # Finalization
-            self._ownership.release()
+            self._array._release(self._index, self._index + 1)
 
             # Short-circuit for non-exceptional execution
-            if all(map(lambda x: x is None, (exc_type, exc_val, exc_tb))):
+            if _no_exception(exc_type, exc_val, exc_tb):
                 return True
 
             # Handle exceptions: return True to omit and False to raise
@@ -81,52 +207,181 @@ class Array(_Tuple, metaclass=Singleton):
         @property
         def all(self) -> Tuple[Color, int]:
             """Returns (color, brightness)"""
-            with self._lock:
-                return self._color, self._brightness
+            array = self._array
+            offset = self._index * LED_SIZE
+            with array._lock:
+                brightness, b, g, r = array._state[offset:offset + LED_SIZE]
+            return Color(r, g, b), brightness
+
+        @property
+        def generation(self) -> int:
+            """Generation of the last change"""
+            with self._array._lock:
+                return self._array._generations[self._index]
 
         @property
         def color(self) -> Color:
-            with self._lock:
-                return self._color
+            return self.all[0]
 
         @color.setter
         def color(self, value: Color) -> None:
-            with self._ownership, self._lock:
-                self._color = value
+            self._array._update(self._index, self._index + 1, colors=(value,))
 
         @color.deleter
         def color(self) -> None:
-            with self._ownership, self._lock:
-                self._color = Color()
+            self._array._update(
+                self._index, self._index + 1, colors=(Color(),))
 
         @property
         def brightness(self) -> float:
-            with self._lock:
-                return self._brightness / MAX_BRIGHTNESS
+            array = self._array
+            with array._lock:
+                value = array._state[self._index * LED_SIZE + BRIGHTNESS]
+            return value / MAX_BRIGHTNESS
 
         @brightness.setter
         def brightness(self, value: float) -> None:
-            # Check boundaries
-            value = 1.0 if value >= 1.0 else 0.0 if value <= 0.0 else value
+            self._array._update(
+                self._index, self._index + 1, brightness=(value,))
+
+    class Range:
+        """
+        Contiguous range of leds, as returned by slicing an `Array` with a
+        step of 1
+
+        It is a sequence of leds with the bulk `color` and `brightness`
+        properties of the array, restricted to the range. As a context manager
+        it grants ownership of every led of the range to the current thread
+        in a single acquisition: the whole range is claimed at once or not at
+        all, so threads claiming overlapping ranges never hold part of one
+        while waiting for the rest. Claiming every needed led in one range,
+        instead of nesting claims, avoids deadlocks altogether.
+        """
+
+        __slots__ = ('_array', '_start', '_stop')
+
+        def __init__(self, array: "Array", start: int, stop: int) -> None:
+            self._array = array
+            self._start = start
+            self._stop = stop
+
+        def __str__(self) -> str:
+            return "({})".format(", ".join(map(str, self)))
+
+        def __len__(self) -> int:
+            return self._stop - self._start
+
+        def __iter__(self) -> Iterator["Array.Led"]:
+            return iter(tuple.__getitem__(
+                self._array, slice(self._start, self._stop)))
+
+        def __getitem__(self, key: Union[int, slice]) -> Any:
+            if isinstance(key, slice):
+                start, stop, step = key.indices(len(self))
+                if step != 1:
+                    return tuple(self)[key]
+                return Array.Range(self._array, self._start + start,
+                                   self._start + max(start, stop))
+            if not -len(self) <= key < len(self):
+                raise IndexError("led index out of range")
+            return self._array[self._start + key % len(self)]
+
+        def __enter__(self) -> "Array.Range":
+            # Initialization
+            self._array._acquire(self._start, self._stop)
 
-            with self._ownership, self._lock:
-                self._brightness = int(value * MAX_BRIGHTNESS)
+            # Return itself
+            return self
+
+        def __exit__(
+                self,
+                exc_type: Optional[Type[BaseException]],
+                exc_val: Optional[Exception],
+                exc_tb: Optional[TracebackType],
+        ) -> bool:
+            # Finalization
+            self._array._release(self._start, self._stop)
+
+            # Handle exceptions: return True to omit and False to raise
+            return _no_exception(exc_type, exc_val, exc_tb)
+
+        @property
+        def start(self) -> int:
+            return self._start
+
+        @property
+        def stop(self) -> int:
+            return self._stop
+
+        @property
+        def color(self) -> Tuple[Color, ...]:
+            return self._array.color[self._start:self._stop]
+
+        @color.setter
+        def color(self, value: Union[Color, Sequence[Color]]) -> None:
+            # Handle single items as sequences
+            if isinstance(value, Color):
+                value = [value]
+            # Apply the color in a cycle
+            self._array._update(self._start, self._stop, colors=value)
+
+        @color.deleter
+        def color(self) -> None:
+            self._array._update(self._start, self._stop, colors=(Color(),))
+
+        @property
+        def brightness(self) -> Tuple[float, ...]:
+            return self._array.brightness[self._start:self._stop]
 
-    def __new__(cls) -> "Array":
-        array = super().__new__(cls, (cls.Led() for _ in range(NUM_LEDS)))
-        array._lock = Lock()
-        array._ownership = RLock()
+        @brightness.setter
+        def brightness(self, value: Union[float, Sequence[float]]) -> None:
+            # Handle single items as sequences
+            if isinstance(value, float):
+                value = [value]
+            # Apply the brightness in a cycle
+            self._array._update(self._start, self._stop, brightness=value)
+
+    def __new__(cls, num_leds: int=NUM_LEDS) -> "Array":
+        if num_leds < 1:
+            raise ValueError("An array needs at least one led")
+        leds = [cls.Led(i) for i in range(num_leds)]
+        array = super().__new__(cls, leds)
+        for led in leds:
+            led._array = array
+        array._state = bytearray(LED_SIZE * num_leds)
+        array._state[BRIGHTNESS::LED_SIZE] = \
+            bytes((MAX_BRIGHTNESS // 2,)) * num_leds
+        array._latest = next(_generations)
+        array._generations = [array._latest] * num_leds
+        array._owners = [None] * num_leds
+        array._depths = [0] * num_leds
+        array._owned = 0
+        array._shadow = None
+        array._stack = []  # type: List[Frame]
+        array._memory = None
+        array._finalizer = None  # type: Optional[finalize]
+        # Views handed out, the state can not be detached while they exist
+        array._views = []  # type: List[ref]
+        array._sequence = 0
+        array.on_wait = \
+            None  # type: Optional[Callable[[int, int, int], None]]
+        array._lock = Condition()
         return array
 
     def __str__(self) -> str:
-        with self._lock:
-            return "({})".format(", ".join(map(str, self)))
+        return "({})".format(", ".join(map(str, self)))
+
+    def __getitem__(self, key: Union[int, slice]) -> Any:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                return super().__getitem__(key)
+            return Array.Range(self, start, max(start, stop))
+        return super().__getitem__(key)
 
     def __enter__(self) -> "Array":
         # Initialization
-        self._ownership.acquire()
-        for led in self:
-            led.__enter__()
+        self._acquire(0, len(self))
 
         # Return itself
         return self
@@ -138,18 +393,424 @@ class Array(_Tuple, metaclass=Singleton):
             exc_tb: Optional[TracebackType],
     ) -> bool:
         # Finalization
-        results = []
-        for led in self:
-            results.append(led.__exit__(exc_type, exc_val, exc_tb))
-        self._ownership.release()
+        self._release(0, len(self))
 
         # Handle exceptions: return True to omit and False to raise
-        return all(results)
+        return _no_exception(exc_type, exc_val, exc_tb)
+
+    @classmethod
+    def shared(cls, num_leds: int=NUM_LEDS,
+               name: Optional[str]=None) -> "Array":
+        """
+        New array whose state is stored in a new shared memory segment
+
+        Other processes get an array over the same state with `attach` and
+        the segment `name`, a random one by default. The segment is removed
+        when this array is closed.
+        """
+        from multiprocessing import shared_memory
+        array = cls(num_leds)
+        size = len(array._state)
+        memory = shared_memory.SharedMemory(
+            name, create=True, size=SHARED_HEADER.size + size)
+        SHARED_HEADER.pack_into(memory.buf, 0, SHARED_MAGIC, num_leds, 0, 0)
+        memory.buf[SHARED_HEADER.size:SHARED_HEADER.size + size] = \
+            array._state
+        array._share(memory, creator=True)
+        _created.add(memory.name)
+        return array
+
+    @classmethod
+    def attach(cls, name: str) -> "Array":
+        """Array over the state of the shared memory segment `name`"""
+        memory = _attach(name)
+        try:
+            magic, num_leds, _, _ = SHARED_HEADER.unpack_from(memory.buf)
+            if magic != SHARED_MAGIC:
+                raise ValueError("{} is not a shared led array".format(name))
+            array = cls(num_leds)
+        except BaseException:
+            memory.close()
+            raise
+        array._share(memory, creator=False)
+        return array
+
+    def _share(self, memory: Any, creator: bool) -> None:
+        with self._lock:
+            self._memory = memory
+            self._state = memory.buf[
+                SHARED_HEADER.size:SHARED_HEADER.size + LED_SIZE * len(self)]
+            # Detached at exit unless closed before, so the segment is not
+            # left behind
+            self._finalizer = finalize(
+                memory, _detach, memory, self._state, creator)
+            state, self._sequence = self._read()
+            self._shadow = bytearray(state)
 
     @property
-    def color(self) -> Tuple[Color, ...]:
+    def name(self) -> Optional[str]:
+        """Name of the shared memory segment, None if the state is private"""
+        return None if self._memory is None else self._memory.name
+
+    def close(self) -> None:
+        """
+        Detach from the shared memory segment, keeping a private copy of the
+        state, and remove it if it was created by this array
+
+        NumPy views of the state must have been released before. Arrays that
+        are not closed are detached at exit.
+        """
+        with self._lock:
+            if self._memory is None:
+                return
+            try:
+                self._sync()
+            except SharedStateError:
+                # Keep the last consistent copy
+                pass
+            if any(view() is not None for view in self._views):
+                raise BufferError("NumPy views of the state still exist")
+            self._state = bytearray(self._shadow)
+            self._shadow = None
+            self._finalizer()
+            self._memory = None
+
+    def _wait(self, start: int, stop: int) -> None:
+        """Wait until no other thread owns a led in range (lock held)"""
+        me = get_ident()
+        owners = self._owners
+        start_time = None
+        while self._owned and any(owner is not None and owner != me
+                                  for owner in owners[start:stop]):
+            if start_time is None:
+                start_time = perf_counter_ns()
+            self._lock.wait()
+        if start_time is not None and self.on_wait is not None:
+            self.on_wait(start, stop, perf_counter_ns() - start_time)
+
+    def _acquire(self, start: int, stop: int) -> None:
+        me = get_ident()
+        with self._lock:
+            self._wait(start, stop)
+            for i in range(start, stop):
+                if self._depths[i] == 0:
+                    self._owners[i] = me
+                    self._owned += 1
+                self._depths[i] += 1
+
+    def _release(self, start: int, stop: int) -> None:
+        with self._lock:
+            for i in range(start, stop):
+                self._depths[i] -= 1
+                if self._depths[i] == 0:
+                    self._owners[i] = None
+                    self._owned -= 1
+            self._lock.notify_all()
+
+    def _update(
+            self,
+            start: int,
+            stop: int,
+            colors: Optional[Iterable[Color]]=None,
+            brightness: Optional[Iterable[float]]=None,
+    ) -> None:
+        """
+        Set the state of the leds in range with a single lock acquisition
+
+        The provided iterables are repeated cyclically to cover the range.
+        """
+        length = stop - start
+        updates = []
+        # Iterated once per channel, and possibly unbounded iterators
+        if colors is not None:
+            colors = tuple(islice(colors, length))
+        if brightness is not None:
+            brightness = tuple(islice(brightness, length))
+        if colors:
+            # Pack the sequence once and tile it, out of the lock
+            for channel, attribute in ((BLUE, 'b'), (GREEN, 'g'), (RED, 'r')):
+                pattern = bytes(int(getattr(color, attribute))
+                                for color in colors)
+                updates.append((channel, _tile(pattern, length)))
+        if brightness:
+            pattern = bytes(_quantize(value) for value in brightness)
+            updates.append((BRIGHTNESS, _tile(pattern, length)))
+
+        self._write(start, stop, updates)
+
+    def _write(
+            self,
+            start: int,
+            stop: int,
+            updates: Sequence[Tuple[int, bytes]],
+    ) -> None:
+        """Assign packed channel values to the leds in range"""
+        if not updates or start == stop:
+            return
+
+        length = stop - start
+        with self._lock:
+            self._wait(start, stop)
+            self._sync()
+            sequence = self._begin()
+            for channel, values in updates:
+                self._state[start * LED_SIZE + channel:stop * LED_SIZE:
+                            LED_SIZE] = values
+            self._end(sequence)
+            self._latest = next(_generations)
+            self._generations[start:stop] = [self._latest] * length
+            if self._shadow is not None:
+                self._shadow[start * LED_SIZE:stop * LED_SIZE] = \
+                    self._state[start * LED_SIZE:stop * LED_SIZE]
+                self._sequence = sequence
+
+    def _begin(self) -> int:
+        """Flag the shared state as being written (lock held)"""
+        if self._memory is None:
+            return 0
+        sequence = self._sequence + 1
+        _SEQUENCE.pack_into(self._memory.buf, _SEQUENCE_OFFSET, sequence)
+        return sequence + 1
+
+    def _end(self, sequence: int) -> None:
+        """Flag the end of a write of the shared state (lock held)"""
+        if self._memory is not None:
+            _SEQUENCE.pack_into(self._memory.buf, _SEQUENCE_OFFSET, sequence)
+
+    def _read(self) -> Tuple[bytes, int]:
+        """
+        Consistent copy of the shared state and its sequence (lock held)
+
+        Raises `SharedStateError` if no consistent copy could be taken within
+        `READ_TIMEOUT`, e.g. because a writer process died mid-write.
+        """
+        buffer = self._memory.buf
+        deadline = perf_counter_ns() + READ_TIMEOUT
+        while True:
+            before, = _SEQUENCE.unpack_from(buffer, _SEQUENCE_OFFSET)
+            if not before & 1:
+                state = bytes(self._state)
+                after, = _SEQUENCE.unpack_from(buffer, _SEQUENCE_OFFSET)
+                if after == before:
+                    return state, before
+            if perf_counter_ns() > deadline:
+                raise SharedStateError(
+                    "The shared state of {} is still being written, a writer "
+                    "may have died".format(self.name))
+            sleep(0)
+
+    def _sync(self) -> None:
+        """
+        Stamp the leds changed through the NumPy views or by other processes
+        (lock held)
+        """
+        state = self._state
+        if self._memory is not None:
+            buffer = self._memory.buf
+            sequence, = _SEQUENCE.unpack_from(buffer, _SEQUENCE_OFFSET)
+            flags, = _FLAGS.unpack_from(buffer, _FLAGS_OFFSET)
+            # Writes through views have to be found by comparing the state
+            if sequence == self._sequence and not flags & _VIEWED:
+                return
+            state, self._sequence = self._read()
+        if self._shadow is None or self._shadow == state:
+            return
+        self._latest = next(_generations)
+        for i in _changed(self._shadow, state, len(self)):
+            self._generations[i] = self._latest
+        self._shadow[:] = state
+
+    def _view(self, exposed: bool=True) -> Any:
+        """
+        (N, 4) NumPy view of the packed state
+
+        Unless the view is only written while sequenced (see `vectorized`),
+        every process sharing the state compares it on every `_sync` from
+        then on, as writes through it do not move the sequence counter.
+        """
+        np = _numpy()
+        if np is None:
+            raise ImportError("NumPy is required to view the leds state")
+        with self._lock:
+            if self._shadow is None:
+                self._shadow = bytearray(self._state)
+            if exposed and self._memory is not None:
+                buffer = self._memory.buf
+                flags, = _FLAGS.unpack_from(buffer, _FLAGS_OFFSET)
+                _FLAGS.pack_into(buffer, _FLAGS_OFFSET, flags | _VIEWED)
+            buffer = np.frombuffer(self._state, dtype=np.uint8)
+            # Every view derived from it keeps it alive
+            self._views = [alive for alive in self._views
+                           if alive() is not None]
+            self._views.append(ref(buffer))
+        return buffer.reshape(len(self), LED_SIZE)
+
+    @property
+    def color_view(self) -> Any:
+        """
+        (N, 3) uint8 NumPy view of the red, green and blue channels
+
+        It shares memory with the state that is displayed, so writes through
+        it are displayed too. Use `vectorized` to make them atomic.
+        """
+        return self._view()[:, RED:BRIGHTNESS:-1]
+
+    @property
+    def brightness_view(self) -> Any:
+        """(N,) uint8 NumPy view of the brightness levels (0..31)"""
+        return self._view()[:, BRIGHTNESS]
+
+    @contextmanager
+    def vectorized(self) -> Iterator[Tuple[Any, Any]]:
+        """
+        Context manager that holds the array lock during a vectorized update
+
+        It waits until no other thread owns any led and yields the color and
+        brightness views:
+
+            with leds.vectorized() as (color, brightness):
+                color[:] = numpy.roll(color, 1, axis=0)
+                brightness[::2] = 31
+        """
+        view = self._view(exposed=False)
         with self._lock:
-            return tuple(led.color for led in self)
+            self._wait(0, len(self))
+            self._sync()
+            sequence = self._begin()
+            try:
+                yield view[:, RED:BRIGHTNESS:-1], view[:, BRIGHTNESS]
+            finally:
+                self._end(sequence)
+                self._sync()
+
+    def checkpoint(self) -> int:
+        """Returns a generation older than any change made afterwards"""
+        with self._lock:
+            # Changes not stamped yet were made before the checkpoint
+            self._sync()
+            return next(_generations)
+
+    def changed(self, since: int) -> int:
+        """
+        Number of leading leds that cover every change made after `since`
+
+        Zero means that no led changed, while a number lower than the length of
+        the array means that the trailing leds did not change.
+        """
+        with self._lock:
+            self._sync()
+            if self._latest <= since:
+                return 0
+            generations = self._generations
+            for i in range(len(self), 0, -1):
+                if generations[i - 1] > since:
+                    return i
+            return 0
+
+    def dump(self, num_leds: Optional[int]=None) -> bytes:
+        """
+        Copy of the packed state of the first `num_leds` leds (all by default)
+
+        Every led is represented by four bytes: brightness (0..31), blue, green
+        and red.
+        """
+        if num_leds is None:
+            num_leds = len(self)
+        with self._lock:
+            if self._memory is not None:
+                return self._read()[0][:num_leds * LED_SIZE]
+            return bytes(self._state[:num_leds * LED_SIZE])
+
+    def load(self, state: bytes, offset: int=0) -> None:
+        """
+        Replace the packed state of the leds starting at `offset`
+
+        `state` has the layout returned by `dump`, four bytes per led, and
+        brightness levels above the maximum are clamped.
+        """
+        stop = self._range(len(state), LED_SIZE, offset)
+        self._write(offset, stop, [
+            (BRIGHTNESS, state[BRIGHTNESS::LED_SIZE].translate(_CLAMP)),
+            (BLUE, state[BLUE::LED_SIZE]),
+            (GREEN, state[GREEN::LED_SIZE]),
+            (RED, state[RED::LED_SIZE]),
+        ])
+
+    def load_rgb(self, rgb: bytes, offset: int=0) -> None:
+        """
+        Replace the colors of the leds starting at `offset`
+
+        `rgb` holds three bytes per led, red, green and blue, and the
+        brightness of the leds is kept.
+        """
+        stop = self._range(len(rgb), 3, offset)
+        self._write(offset, stop,
+                    [(RED, rgb[0::3]), (GREEN, rgb[1::3]), (BLUE, rgb[2::3])])
+
+    def _range(self, size: int, item_size: int, offset: int) -> int:
+        """End of the leds covered by `size` bytes of data from `offset`"""
+        if size % item_size:
+            raise ValueError("Data size is not a multiple of {}".format(
+                item_size))
+        stop = offset + size // item_size
+        if offset < 0 or stop > len(self):
+            raise ValueError("Data does not fit in {} leds from {}".format(
+                len(self), offset))
+        return stop
+
+    def snapshot(self) -> "Frame":
+        """Immutable copy of the state of every led, taken atomically"""
+        from .frame import Frame
+        return Frame(self.dump())
+
+    def restore(self, frame: bytes) -> None:
+        """Apply a `snapshot` of this array with a single bulk write"""
+        if len(frame) != len(self) * LED_SIZE:
+            raise ValueError("The frame does not match the leds")
+        self.load(frame)
+
+    def push(self, frame: Optional[bytes]=None) -> None:
+        """
+        Save a snapshot of the leds in a stack, to be restored by `pop`, and
+        then apply `frame` if provided
+        """
+        snapshot = self.snapshot()
+        with self._lock:
+            self._stack.append(snapshot)
+        if frame is not None:
+            self.restore(frame)
+
+    def pop(self) -> "Frame":
+        """Restore the last snapshot saved by `push` and return it"""
+        with self._lock:
+            if not self._stack:
+                raise IndexError("pop from an empty stack")
+            frame = self._stack.pop()
+        self.restore(frame)
+        return frame
+
+    @contextmanager
+    def overlay(self, frame: Optional[bytes]=None) -> Iterator["Array"]:
+        """
+        Context manager that takes over the leds temporarily, like a
+        notification, restoring their previous state when it exits:
+
+            with leds.overlay():
+                leds.color = Color(255, 0, 0)
+                board.display()
+                sleep(1)
+        """
+        self.push(frame)
+        try:
+            yield self
+        finally:
+            self.pop()
+
+    @property
+    def color(self) -> Tuple[Color, ...]:
+        state = self.dump()
+        return tuple(Color(state[i + RED], state[i + GREEN], state[i + BLUE])
+                     for i in range(0, len(state), LED_SIZE))
 
     @color.setter
     def color(self, value: Union[Color, Sequence[Color]]) -> None:
@@ -157,20 +818,16 @@ class Array(_Tuple, metaclass=Singleton):
         if isinstance(value, Color):
             value = [value]
         # Apply the color in a cycle
-        with self._ownership, self._lock:
-            for led, color in zip(self, cycle(value)):
-                led.color = color
+        self._update(0, len(self), colors=value)
 
     @color.deleter
     def color(self) -> None:
-        with self._ownership, self._lock:
-            for led in self:
-                del led.color
+        self._update(0, len(self), colors=(Color(),))
 
     @property
     def brightness(self) -> Tuple[float, ...]:
-        with self._lock:
-            return tuple(led.brightness for led in self)
+        state = self.dump()[BRIGHTNESS::LED_SIZE]
+        return tuple(value / MAX_BRIGHTNESS for value in state)
 
     @brightness.setter
     def brightness(self, value: Union[float, Sequence[float]]) -> None:
@@ -178,6 +835,4 @@ class Array(_Tuple, metaclass=Singleton):
         if isinstance(value, float):
             value = [value]
         # Apply the brightness in a cycle
-        with self._ownership, self._lock:
-            for led, brightness in zip(self, cycle(value)):
-                led.brightness = brightness
+        self._update(0, len(self), brightness=value)
@@ -0,0 +1,254 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import mmap
+import os
+import struct
+from threading import Event
+from time import perf_counter_ns
+from types import TracebackType
+from typing import BinaryIO, Iterator, Optional, Tuple, Type, TYPE_CHECKING
+
+from .encoder import LED_FRAME_SIZE
+from .errors import RecordingError
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .board import Board
+
+MAGIC = b'BLKR'
+VERSION = 1
+
+# File header: magic, version, reserved, number of leds
+HEADER = struct.Struct('<4sHHI')
+# Record header: nanoseconds since the start of the recording
+TIMESTAMP = struct.Struct('<Q')
+
+
+class Recorder:
+    """
+    Writes displayed frames to a recording file
+
+    The file starts with a header followed by fixed-size records, each one
+    made of a timestamp and the encoded led frames of the whole chain, exactly
+    as they are sent to the leds (brightness header bits and color correction
+    included). Fixed-size records allow seeking without an index.
+    """
+
+    __slots__ = ('_file', '_num_leds', '_start')
+
+    def __init__(self, path: str, num_leds: int) -> None:
+        self._file = open(path, 'wb')  # type: Optional[BinaryIO]
+        self._num_leds = num_leds
+        self._start = None  # type: Optional[int]
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, num_leds))
+
+    def __enter__(self) -> "Recorder":
+        return self
+
+    def __exit__(
+            self,
+            exc_type: Optional[Type[BaseException]],
+            exc_val: Optional[Exception],
+            exc_tb: Optional[TracebackType],
+    ) -> bool:
+        self.close()
+        return False
+
+    @property
+    def num_leds(self) -> int:
+        return self._num_leds
+
+    @property
+    def closed(self) -> bool:
+        return self._file is None
+
+    def record(self, leds: bytes, timestamp: Optional[int]=None) -> None:
+        """
+        Append the encoded led frames of the whole chain
+
+        `timestamp` is in nanoseconds of `time.perf_counter_ns`, the current
+        time by default.
+        """
+        if self._file is None:
+            raise RecordingError("The recorder is closed")
+        if len(leds) != self._num_leds * LED_FRAME_SIZE:
+            raise RecordingError("Expected {} leds, got {} bytes".format(
+                self._num_leds, len(leds)))
+        if timestamp is None:
+            timestamp = perf_counter_ns()
+        if self._start is None:
+            self._start = timestamp
+        self._file.write(TIMESTAMP.pack(timestamp - self._start))
+        self._file.write(leds)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Player:
+    """
+    Memory-mapped reader of recording files
+
+    Frames are read straight from the mapping, so files larger than the
+    available memory can be played. Frames are indexed like a sequence of
+    (timestamp, led frames) pairs, with timestamps in nanoseconds since the
+    first frame. Indexed led frames are copies, so they outlive the player,
+    while `play` sends them from the mapping without copying them.
+    """
+
+    __slots__ = ('_file', '_map', '_num_leds', '_record_size', '_length')
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, 'rb')
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size < HEADER.size:
+                raise RecordingError("{} is not a recording".format(path))
+            self._map = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+
+        magic, version, _, self._num_leds = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise RecordingError("{} is not a recording".format(path))
+        self._record_size = TIMESTAMP.size + self._num_leds * LED_FRAME_SIZE
+        # An incomplete trailing record is ignored
+        self._length = (size - HEADER.size) // self._record_size
+        if hasattr(self._map, 'madvise'):
+            self._map.madvise(mmap.MADV_SEQUENTIAL)
+
+    def __enter__(self) -> "Player":
+        return self
+
+    def __exit__(
+            self,
+            exc_type: Optional[Type[BaseException]],
+            exc_val: Optional[Exception],
+            exc_tb: Optional[TracebackType],
+    ) -> bool:
+        self.close()
+        return False
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> Tuple[int, bytes]:
+        timestamp = self.timestamp(index)
+        offset = HEADER.size + self._index(index) * self._record_size + \
+            TIMESTAMP.size
+        return timestamp, self._map[
+            offset:offset + self._record_size - TIMESTAMP.size]
+
+    def __iter__(self) -> Iterator[Tuple[int, bytes]]:
+        for index in range(self._length):
+            yield self[index]
+
+    def _index(self, index: int) -> int:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("frame index out of range")
+        return index
+
+    def _view(self, index: int) -> memoryview:
+        # Must be released before closing the mapping
+        offset = HEADER.size + index * self._record_size + TIMESTAMP.size
+        return memoryview(self._map)[
+            offset:offset + self._record_size - TIMESTAMP.size]
+
+    @property
+    def num_leds(self) -> int:
+        return self._num_leds
+
+    @property
+    def duration(self) -> int:
+        """Timestamp of the last frame, in nanoseconds"""
+        return self.timestamp(self._length - 1) if self._length else 0
+
+    def timestamp(self, index: int) -> int:
+        """Timestamp of a frame without mapping its led frames"""
+        return TIMESTAMP.unpack_from(
+            self._map, HEADER.size + self._index(index) * self._record_size)[0]
+
+    def seek(self, timestamp: int) -> int:
+        """Index of the frame shown at `timestamp` (binary search)"""
+        low, high = 0, self._length
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamp(middle) <= timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return max(low - 1, 0)
+
+    def play(
+            self,
+            board: "Board",
+            start: int=0,
+            loop: bool=False,
+            stop: Optional[Event]=None,
+    ) -> None:
+        """
+        Send the frames to `board` at their recorded timing
+
+        Frames are scheduled against the time playback started, so delays do
+        not accumulate: if sending falls behind, the frames that are already
+        overdue are skipped. Playback starts at frame `start` and, if `loop`
+        is set, repeats until `stop` is set.
+        """
+        if self._num_leds != board.num_leds:
+            raise RecordingError("Recorded {} leds, the board has {}".format(
+                self._num_leds, board.num_leds))
+        if self._length:
+            start = self._index(start)
+        if stop is None:
+            stop = Event()
+        while self._length and not stop.is_set():
+            index = start
+            offset = self.timestamp(start)
+            origin = perf_counter_ns()
+            while index < self._length and not stop.is_set():
+                delay = self.timestamp(index) - offset - \
+                    (perf_counter_ns() - origin)
+                if delay > 0 and stop.wait(delay / 1e9):
+                    return
+                with self._view(index) as leds:
+                    board.send(leds)
+
+                # Skip the frames that are already overdue
+                elapsed = perf_counter_ns() - origin + offset
+                index = max(index + 1, self.seek(elapsed))
+            if not loop:
+                return
+            start = 0
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
@@ -0,0 +1,158 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from threading import Event, Thread
+from time import perf_counter
+from typing import Any, Callable, Iterator, Optional, Union, TYPE_CHECKING
+
+from .leds import Array
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .board import Board
+
+Producer = Union[Callable[[Array], Any], Iterator[Any]]
+
+
+class Scheduler:
+    """
+    Background thread that displays a board at a target frame rate
+
+    Frames are paced against absolute deadlines instead of sleeping after the
+    work is done, so the time spent producing and sending a frame does not
+    accumulate as drift. A frame that ends after the deadline of the next one
+    is counted as late, and the frame slots that were missed because of it are
+    counted as dropped.
+
+    The optional producer is called before every frame to update the leds. It
+    can be a callable, which receives the leds, or an iterator, which is
+    advanced once per frame; the scheduler stops when it is exhausted.
+    """
+
+    __slots__ = ('_board', '_period', '_producer', '_thread', '_stop',
+                 '_frames', '_late', '_dropped', '_exception')
+
+    def __init__(
+            self,
+            board: "Board",
+            fps: float,
+            producer: Optional[Producer]=None,
+    ) -> None:
+        if fps <= 0:
+            raise ValueError("fps must be positive")
+        self._board = board
+        self._period = 1 / fps
+        self._producer = producer
+        self._thread = None  # type: Optional[Thread]
+        self._stop = Event()
+        self._frames = 0
+        self._late = 0
+        self._dropped = 0
+        self._exception = None  # type: Optional[BaseException]
+
+    def __str__(self) -> str:
+        return "<Scheduler {:g}fps frames={} late={} dropped={}>".format(
+            self.fps, self._frames, self._late, self._dropped)
+
+    @property
+    def fps(self) -> float:
+        """Target frame rate"""
+        return 1 / self._period
+
+    @property
+    def running(self) -> bool:
+        """Whether the render thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def frames(self) -> int:
+        """Number of frames displayed"""
+        return self._frames
+
+    @property
+    def late_frames(self) -> int:
+        """Number of frames that ended after the deadline of the next one"""
+        return self._late
+
+    @property
+    def dropped_frames(self) -> int:
+        """Number of frame slots skipped because of late frames"""
+        return self._dropped
+
+    @property
+    def exception(self) -> Optional[BaseException]:
+        """Exception raised by the producer or the board, if any"""
+        return self._exception
+
+    def start(self) -> None:
+        """Start the render thread"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = Thread(
+            target=self._run, name="blinkt-scheduler", daemon=True)
+        self._thread.start()
+
+    def signal(self) -> None:
+        """Ask the render thread to stop without waiting for it"""
+        self._stop.set()
+
+    def stop(self, timeout: Optional[float]=None) -> None:
+        """Stop the render thread and wait for it to finish"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _produce(self) -> bool:
+        producer = self._producer
+        if producer is None:
+            return True
+        if isinstance(producer, Iterator):
+            try:
+                next(producer)
+            except StopIteration:
+                return False
+        else:
+            producer(self._board.leds)
+        return True
+
+    def _run(self) -> None:
+        period = self._period
+        deadline = perf_counter()
+        try:
+            while not self._stop.is_set():
+                if not self._produce():
+                    break
+                self._board.display()
+                self._frames += 1
+
+                deadline += period
+                now = perf_counter()
+                if now > deadline:
+                    # Skip the frame slots that can no longer be met
+                    self._late += 1
+                    missed = int((now - deadline) // period) + 1
+                    self._dropped += missed
+                    deadline += missed * period
+                self._stop.wait(deadline - now)
+        except BaseException as e:
+            self._exception = e
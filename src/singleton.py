@@ -21,7 +21,8 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
-from typing import Any, Dict, Tuple
+from threading import Lock
+from typing import Any, Dict, Hashable, Tuple
 
 
 def mangle(class_name: str, attribute: str) -> str:
@@ -45,7 +46,8 @@ class Singleton(type):
     class creation by calling its constructor with no arguments. This means
     that this method does not support classes that require initialization
     parameters. However, singletons should not need initialization parameters
-    as they only have one instance.
+    as they only have one instance. The `__init__` method is only executed the
+    first time, so further calls do not reset the state of the instance.
 
     The private class attributes __instance and __new are used internally.
     If they want to be used by the class, another attribute name should be
@@ -136,3 +138,65 @@ class Singleton(type):
 
         # Assign the first time constructor to the class
         cls.__new__ = wrapped_new
+
+        # Remember where the instance is stored
+        cls.__instance_attribute = mangled_instance
+
+    def __call__(cls, *args, **kwargs):
+        # Only initialize the instance the first time it is requested
+        try:
+            return vars(cls)[cls.__instance_attribute]
+        except KeyError:
+            return super().__call__(*args, **kwargs)
+
+
+class Multiton(type):
+    """
+    Metaclass that keeps a single instance per key
+
+    The key is the first argument of the constructor, given by position or by
+    keyword, `None` by default, so calling the class with no arguments always
+    returns the same default instance, like a singleton, while other keys get
+    their own instances. The `__init__` method is only executed the first
+    time a key is used.
+
+    Usage:
+        class NamedExample(metaclass=Multiton):
+            def __init__(self, name=None):
+                self.name = name
+
+        assert NamedExample() is NamedExample()
+        assert NamedExample('other') is not NamedExample()
+        assert NamedExample(name='other') is NamedExample('other')
+    """
+    def __init__(
+            cls,
+            name: str,
+            bases: Tuple,
+            namespace: Dict[str, Any],
+    ) -> None:
+        super().__init__(name, bases, namespace)
+        cls.__instances = {}  # type: Dict[Hashable, Any]
+        cls.__lock = Lock()
+        # Name of the key argument, following self (inspect is too heavy)
+        code = getattr(cls.__init__, '__code__', None)
+        cls.__key = (code.co_varnames[1]
+                     if code is not None and code.co_argcount > 1 else None)
+
+    def __call__(cls, *args, **kwargs):
+        if args:
+            key, args = args[0], args[1:]
+        else:
+            key = kwargs.pop(cls.__key, None)
+        with cls.__lock:
+            try:
+                return cls.__instances[key]
+            except KeyError:
+                instance = super().__call__(key, *args, **kwargs)
+                cls.__instances[key] = instance
+                return instance
+
+    def instances(cls) -> Dict[Hashable, Any]:
+        """Instances created so far, by key"""
+        with cls.__lock:
+            return dict(cls.__instances)
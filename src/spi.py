@@ -0,0 +1,135 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import os
+import stat
+import struct
+from typing import Optional
+
+from .errors import DisplayError
+from .transport import Transport
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+SPI_BUS = 0
+SPI_DEVICE = 0
+SPI_SPEED = 8000000
+SPI_CHUNK_SIZE = 4096  # Default `bufsiz` of the spidev kernel module
+
+# spidev ioctl requests (linux/spi/spidev.h)
+SPI_IOC_WR_MODE = 0x40016b01
+SPI_IOC_WR_MAX_SPEED_HZ = 0x40046b04
+
+
+class SPITransport(Transport):
+    """
+    Hardware SPI transport through a spidev device
+
+    The whole frame is handed to the kernel with a single write (split in
+    `chunk_size` pieces if it does not fit the spidev buffer), which is orders
+    of magnitude faster than bit-banging.
+
+    Note that the Blinkt board itself is wired to BCM 23/24, which are not the
+    SPI0 pins: either wire the chain to MOSI/SCLK or expose those pins as a
+    spidev device through the `spi-gpio` device tree overlay.
+
+    Any path can be provided instead of a bus and a device, in which case the
+    settings will only be applied if it is a character device. This allows
+    to use a regular file or a pipe as a fake device.
+    """
+
+    __slots__ = ('_path', '_speed', '_chunk_size', '_fd')
+
+    def __init__(
+            self,
+            bus: int=SPI_BUS,
+            device: int=SPI_DEVICE,
+            speed: int=SPI_SPEED,
+            path: Optional[str]=None,
+            chunk_size: int=SPI_CHUNK_SIZE,
+    ) -> None:
+        if path is None:
+            path = "/dev/spidev{}.{}".format(bus, device)
+        self._path = path
+        self._speed = speed
+        self._chunk_size = chunk_size
+        self._fd = None  # type: Optional[int]
+
+    def __str__(self) -> str:
+        return "<SPITransport {} {}Hz>".format(self._path, self._speed)
+
+    @property
+    def path(self) -> str:
+        """Path of the spidev device"""
+        return self._path
+
+    @property
+    def speed(self) -> int:
+        """Clock rate in Hz"""
+        return self._speed
+
+    @speed.setter
+    def speed(self, value: int) -> None:
+        self._speed = value
+        if self._fd is not None:
+            self._configure()
+
+    def _configure(self) -> None:
+        if fcntl is None or not stat.S_ISCHR(os.fstat(self._fd).st_mode):
+            return
+        try:
+            # APA102 samples on the rising edge: mode 0
+            fcntl.ioctl(self._fd, SPI_IOC_WR_MODE, struct.pack('=B', 0))
+            fcntl.ioctl(self._fd, SPI_IOC_WR_MAX_SPEED_HZ,
+                        struct.pack('=I', self._speed))
+        except OSError as e:
+            raise DisplayError(
+                "Unable to configure {}: {}".format(self._path, e)) from e
+
+    def open(self) -> None:
+        try:
+            self._fd = os.open(self._path, os.O_WRONLY)
+        except OSError as e:
+            raise DisplayError(
+                "Unable to open {}: {}".format(self._path, e)) from e
+        try:
+            self._configure()
+        except DisplayError:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def write(self, frame: bytes) -> None:
+        if self._fd is None:
+            raise DisplayError("{} is not open".format(self._path))
+        view = memoryview(frame)
+        while view:
+            written = os.write(self._fd, view[:self._chunk_size])
+            view = view[written:]
@@ -0,0 +1,319 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import os
+from collections import deque
+from threading import Lock
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+WINDOW = 1024
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Called after every frame with its details
+Hook = Callable[[Dict[str, Any]], None]
+
+
+class Histogram:
+    """
+    Rolling window of duration samples, in nanoseconds
+
+    Quantiles are computed over the last `window` samples, while the count and
+    the sum of all the samples are kept since the creation.
+    """
+
+    __slots__ = ('_samples', '_count', '_sum')
+
+    def __init__(self, window: int=WINDOW) -> None:
+        self._samples = deque(maxlen=window)  # type: Deque[int]
+        self._count = 0
+        self._sum = 0
+
+    def add(self, value: int) -> None:
+        self._samples.append(value)
+        self._count += 1
+        self._sum += value
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> int:
+        return self._sum
+
+    def quantiles(self) -> Dict[float, float]:
+        """Quantiles of the window, in seconds"""
+        samples = sorted(self._samples)
+        if not samples:
+            return {}
+        return {q: samples[min(int(q * len(samples)), len(samples) - 1)] / 1e9
+                for q in QUANTILES}
+
+    def snapshot(self) -> Dict[str, Any]:
+        samples = self._samples
+        result = {
+            'count': self._count,
+            'sum': self._sum / 1e9,
+        }  # type: Dict[str, Any]
+        if samples:
+            result.update({
+                'min': min(samples) / 1e9,
+                'max': max(samples) / 1e9,
+                'mean': sum(samples) / len(samples) / 1e9,
+            })
+            result.update({'p{:g}'.format(q * 100): value
+                           for q, value in self.quantiles().items()})
+        return result
+
+
+class Stats:
+    """
+    Per-frame instrumentation of a board
+
+    It is disabled by default, and it can be enabled or disabled at any time
+    through `enabled`. While disabled, nothing is recorded. Durations are kept
+    in rolling histograms:
+
+        lock_wait:       waiting for the board lock in `display`
+        ownership_wait:  waiting for leds owned by other threads
+        encode:          encoding the frame
+        transmit:        sending the frame through the transport
+
+    Ownership waits are also profiled per range of leds (see `contention`),
+    to find which claims serialize the threads.
+
+    Hooks are called after every transmitted frame, out of the board lock,
+    with a dict describing it.
+    """
+
+    __slots__ = ('_enabled', '_lock', '_hooks', '_window', '_frames',
+                 '_skipped', '_truncated', '_leds', '_bytes', '_histograms',
+                 '_times', '_ranges', '_merged')
+
+    def __init__(self, window: int=WINDOW) -> None:
+        self._enabled = False
+        self._lock = Lock()
+        self._hooks = []  # type: List[Hook]
+        self._window = window
+        self.reset()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool) -> None:
+        self._enabled = value
+
+    def reset(self) -> None:
+        """Discard every measure"""
+        with self._lock:
+            self._frames = 0
+            self._skipped = 0
+            self._truncated = 0
+            self._merged = 0
+            self._leds = 0
+            self._bytes = 0
+            self._histograms = {
+                name: Histogram(self._window)
+                for name in ('lock_wait', 'ownership_wait', 'encode',
+                             'transmit')
+            }  # type: Dict[str, Histogram]
+            # Transmission times, to compute the frame rate
+            self._times = deque(maxlen=self._window)  # type: Deque[int]
+            # Ownership waits per range: count, sum and max
+            self._ranges = {}  # type: Dict[Tuple[int, int], List[int]]
+
+    def add_hook(self, hook: Hook) -> None:
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Hook) -> None:
+        self._hooks.remove(hook)
+
+    def ownership_wait(self, start: int, stop: int, duration: int) -> None:
+        """Record a wait for the leds in range, in nanoseconds"""
+        if self._enabled:
+            with self._lock:
+                self._histograms['ownership_wait'].add(duration)
+                profile = self._ranges.get((start, stop))
+                if profile is None:
+                    self._ranges[start, stop] = [1, duration, duration]
+                else:
+                    profile[0] += 1
+                    profile[1] += duration
+                    profile[2] = max(profile[2], duration)
+
+    def contention(self) -> List[Dict[str, Any]]:
+        """
+        Ownership waits per range of leds, longest total wait first, with
+        durations in seconds
+        """
+        with self._lock:
+            ranges = sorted(self._ranges.items(), key=lambda item: -item[1][1])
+            return [{
+                'start': start,
+                'stop': stop,
+                'count': count,
+                'sum': total / 1e9,
+                'max': longest / 1e9,
+            } for (start, stop), (count, total, longest) in ranges]
+
+    def merged(self) -> None:
+        """Record a `display` call served by another transmission"""
+        if self._enabled:
+            with self._lock:
+                self._merged += 1
+
+    def skipped(self, lock_wait: int) -> None:
+        """Record a `display` call that sent nothing"""
+        if self._enabled:
+            with self._lock:
+                self._skipped += 1
+                self._histograms['lock_wait'].add(lock_wait)
+
+    def frame(
+            self,
+            time: int,
+            lock_wait: int,
+            encode: int,
+            transmit: int,
+            leds: int,
+            size: int,
+            truncated: bool,
+    ) -> None:
+        """Record a transmitted frame, times and durations in nanoseconds"""
+        if not self._enabled:
+            return
+        with self._lock:
+            self._frames += 1
+            self._truncated += truncated
+            self._leds += leds
+            self._bytes += size
+            self._histograms['lock_wait'].add(lock_wait)
+            self._histograms['encode'].add(encode)
+            self._histograms['transmit'].add(transmit)
+            self._times.append(time)
+        if self._hooks:
+            info = {
+                'time': time / 1e9,
+                'lock_wait': lock_wait / 1e9,
+                'encode': encode / 1e9,
+                'transmit': transmit / 1e9,
+                'leds': leds,
+                'bytes': size,
+                'truncated': truncated,
+            }
+            for hook in self._hooks:
+                hook(info)
+
+    @property
+    def fps(self) -> float:
+        """Frame rate achieved over the window"""
+        times = self._times
+        if len(times) < 2 or times[-1] == times[0]:
+            return 0.0
+        return (len(times) - 1) * 1e9 / (times[-1] - times[0])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Every measure as a dict, durations in seconds"""
+        contention = self.contention()
+        with self._lock:
+            return {
+                'frames': self._frames,
+                'skipped': self._skipped,
+                'truncated': self._truncated,
+                'merged': self._merged,
+                'leds': self._leds,
+                'bytes': self._bytes,
+                'fps': self.fps,
+                **{name: histogram.snapshot()
+                   for name, histogram in self._histograms.items()},
+                'contention': contention,
+            }
+
+    def prometheus(self, prefix: str='blinkt') -> str:
+        """Every measure in the Prometheus text exposition format"""
+        lines = []
+
+        def metric(name: str, kind: str, text: str, value: Any) -> None:
+            name = "{}_{}".format(prefix, name)
+            lines.append("# HELP {} {}".format(name, text))
+            lines.append("# TYPE {} {}".format(name, kind))
+            lines.append("{} {}".format(name, value))
+
+        with self._lock:
+            metric('frames_total', 'counter', "Frames transmitted.",
+                   self._frames)
+            metric('frames_skipped_total', 'counter',
+                   "Display calls that did not transmit anything.",
+                   self._skipped)
+            metric('frames_truncated_total', 'counter',
+                   "Frames that only included the leading leds.",
+                   self._truncated)
+            metric('display_merged_total', 'counter',
+                   "Display calls served by another call's transmission.",
+                   self._merged)
+            metric('leds_total', 'counter', "Led frames transmitted.",
+                   self._leds)
+            metric('bytes_total', 'counter', "Bytes transmitted.",
+                   self._bytes)
+            metric('fps', 'gauge', "Frame rate over the window.", self.fps)
+            for name, histogram in self._histograms.items():
+                name = "{}_{}_seconds".format(prefix, name)
+                lines.append("# HELP {} Duration of {}.".format(
+                    name, name[len(prefix) + 1:-len('_seconds')]
+                    .replace('_', ' ')))
+                lines.append("# TYPE {} summary".format(name))
+                for q, value in histogram.quantiles().items():
+                    lines.append('{}{{quantile="{}"}} {}'.format(
+                        name, q, value))
+                lines.append("{}_sum {}".format(name, histogram.sum / 1e9))
+                lines.append("{}_count {}".format(name, histogram.count))
+            name = "{}_range_wait_seconds".format(prefix)
+            lines.append("# HELP {} Ownership waits per range of leds."
+                         .format(name))
+            lines.append("# TYPE {} summary".format(name))
+            for (start, stop), (count, total, _) in self._ranges.items():
+                labels = '{{range="{}:{}"}}'.format(start, stop)
+                lines.append("{}_sum{} {}".format(name, labels, total / 1e9))
+                lines.append("{}_count{} {}".format(name, labels, count))
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str='blinkt') -> None:
+        """
+        Write `prometheus` output to `path` atomically
+
+        The file is replaced at once, so collectors that read a directory of
+        text files (like the node exporter) never see a partial file.
+        """
+        import tempfile
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as output:
+                output.write(self.prometheus(prefix))
+            os.chmod(temporary, 0o644)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
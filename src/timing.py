@@ -0,0 +1,189 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from functools import partial
+from math import ceil
+from time import perf_counter_ns, sleep
+from typing import Callable, Optional
+
+CALIBRATION_BYTES = 256
+CALIBRATION_SPINS = 64
+CALIBRATION_REPEAT = 5
+CALIBRATION_ROUNDS = 8
+
+
+class Timing:
+    """
+    Strategy that paces the clock edges of a bit-banged transport
+
+    `delay` returns the function called after every clock edge, or None if no
+    delay is needed at all, which allows the transport to use a tighter loop.
+    """
+
+    __slots__ = ()
+
+    def calibrate(self, send: Callable[[bytes], None]) -> None:
+        """
+        Adjust to the speed of `send`, which writes a frame through the loop of
+        the transport paced by this strategy
+        """
+
+    def delay(self) -> Optional[Callable[[], None]]:
+        """Function that waits between clock edges"""
+        return None
+
+
+class NoDelay(Timing):
+    """Clock edges as fast as the Python loop can toggle the pins"""
+
+    __slots__ = ()
+
+    def __str__(self) -> str:
+        return "<NoDelay>"
+
+
+class Sleep(Timing):
+    """
+    Half a period of `time.sleep` after every clock edge
+
+    The operating system sleeps much longer than requested for periods in the
+    microsecond range, so this is by far the slowest strategy.
+    """
+
+    __slots__ = ('_half_period',)
+
+    def __init__(self, frequency: float) -> None:
+        self._half_period = 0.5 / frequency
+
+    def __str__(self) -> str:
+        return "<Sleep {:g}s>".format(self._half_period)
+
+    def delay(self) -> Optional[Callable[[], None]]:
+        return partial(sleep, self._half_period)
+
+
+class BusyWait(Timing):
+    """
+    Spin on `perf_counter_ns` until half a period passed since the last edge
+
+    It is accurate but burns CPU for the whole frame.
+    """
+
+    __slots__ = ('_half_period', '_last')
+
+    def __init__(self, frequency: float) -> None:
+        self._half_period = int(5e8 / frequency)
+        self._last = 0
+
+    def __str__(self) -> str:
+        return "<BusyWait {}ns>".format(self._half_period)
+
+    def _wait(self) -> None:
+        deadline = self._last + self._half_period
+        now = perf_counter_ns()
+        while now < deadline:
+            now = perf_counter_ns()
+        self._last = now
+
+    def delay(self) -> Optional[Callable[[], None]]:
+        return self._wait
+
+
+class Calibrated(Timing):
+    """
+    Delays sized at startup to match a requested clock frequency
+
+    `calibrate` measures the bit rate of the actual write loop of the
+    transport. If the undelayed loop is already slower than requested, no
+    delay is added at all. Otherwise every half period is padded with empty
+    loop iterations, sized from the rates measured with two different
+    numbers of iterations, and then increased until the measured rate does
+    not exceed `frequency`.
+    """
+
+    __slots__ = ('_frequency', '_natural', '_spins')
+
+    def __init__(self, frequency: float) -> None:
+        self._frequency = frequency
+        self._natural = None  # type: Optional[float]
+        self._spins = range(0)
+
+    def __str__(self) -> str:
+        return "<Calibrated {:g}Hz spins={}>".format(
+            self._frequency, len(self._spins))
+
+    @property
+    def frequency(self) -> float:
+        """Requested clock frequency"""
+        return self._frequency
+
+    @property
+    def natural_frequency(self) -> Optional[float]:
+        """Frequency of the undelayed loop measured by `calibrate`"""
+        return self._natural
+
+    def calibrate(self, send: Callable[[bytes], None]) -> None:
+        frame = bytes(CALIBRATION_BYTES)
+        self._spins = range(0)
+        # Warm up, the first frames are slower
+        send(frame)
+        self._natural = self._rate(send, frame)
+        if self._natural <= self._frequency:
+            return
+
+        # The period of a bit grows linearly with the spins of its delays
+        self._spins = range(1)
+        low = 1e9 / self._rate(send, frame)
+        self._spins = range(CALIBRATION_SPINS)
+        high = 1e9 / self._rate(send, frame)
+        spin = (high - low) / (CALIBRATION_SPINS - 1)
+        if spin > 0:
+            spins = max(1 + ceil((1e9 / self._frequency - low) / spin), 1)
+        else:
+            spins = CALIBRATION_SPINS
+
+        # Measurements are noisy, never exceed the requested frequency
+        for _ in range(CALIBRATION_ROUNDS):
+            self._spins = range(spins)
+            rate = self._rate(send, frame)
+            if rate <= self._frequency:
+                break
+            spins = ceil(spins * rate / self._frequency) + 1
+
+    def _rate(self, send: Callable[[bytes], None], frame: bytes) -> float:
+        """Highest bit rate of `send` over a few repetitions"""
+        elapsed = None
+        for _ in range(CALIBRATION_REPEAT):
+            start = perf_counter_ns()
+            send(frame)
+            duration = perf_counter_ns() - start
+            if elapsed is None or duration < elapsed:
+                elapsed = duration
+        return 8e9 * len(frame) / elapsed if elapsed else float('inf')
+
+    def _wait(self) -> None:
+        for _ in self._spins:
+            pass
+
+    def delay(self) -> Optional[Callable[[], None]]:
+        return self._wait if self._spins else None
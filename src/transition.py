@@ -0,0 +1,190 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from functools import lru_cache
+from threading import Lock
+from time import perf_counter_ns
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from .colors import _numpy
+from .leds import Array, LED_SIZE
+
+# Fixed-point format of the easing tables and the progress: 16.16
+FRACTION_BITS = 16
+ONE = 1 << FRACTION_BITS
+# Easing tables sample the curve at TABLE_SIZE steps, plus the end point
+TABLE_BITS = 8
+TABLE_SIZE = 1 << TABLE_BITS
+_INDEX_SHIFT = FRACTION_BITS - TABLE_BITS
+
+EASINGS = {
+    'linear': lambda t: t,
+    'ease_in': lambda t: t * t,
+    'ease_out': lambda t: t * (2 - t),
+    'ease_in_out': lambda t: t * t * (3 - 2 * t),
+}  # type: Dict[str, Callable[[float], float]]
+
+
+@lru_cache(maxsize=None)
+def easing_table(name: str) -> Tuple[int, ...]:
+    """
+    Fixed-point samples of an easing curve of `EASINGS`, from 0 to `ONE`
+
+    The curve is only evaluated here, so transitions do no float math.
+    """
+    curve = EASINGS[name]
+    return tuple(round(curve(i / TABLE_SIZE) * ONE)
+                 for i in range(TABLE_SIZE + 1))
+
+
+class Transition:
+    """
+    Interpolation of the state of `leds` towards a target state
+
+    Every channel, brightness included, is interpolated with integer math:
+    the elapsed time is turned into a 16.16 fixed-point progress, eased
+    through a precomputed table and applied to the difference between the
+    start and the target state of each byte. Each `step` writes the state for
+    the current time with a single bulk write, so it can be called at display
+    rate, and it can be the producer of a `Scheduler`:
+
+        transition = Transition(board.leds)
+        board.schedule(60, transition)
+        transition.to(frame, 0.5)
+
+    Calling `to` while a transition is in flight retargets it from the state
+    it has reached, so there is no visible jump.
+    """
+
+    __slots__ = ('_leds', '_lock', '_start', '_delta', '_begin', '_duration',
+                 '_table', '_last')
+
+    def __init__(self, leds: Array) -> None:
+        self._leds = leds
+        self._lock = Lock()
+        # Start state and difference to the target, NumPy arrays if available
+        self._start = None  # type: Any
+        self._delta = None  # type: Any
+        self._begin = 0
+        self._duration = 0
+        self._table = easing_table('linear')
+        self._last = None  # type: Optional[bytes]
+
+    def __str__(self) -> str:
+        return "<Transition progress={:.2f}>".format(self.progress / ONE)
+
+    def __call__(self, leds: Array) -> None:
+        """Producer interface, `leds` must be the transitioned array"""
+        self.step()
+
+    @property
+    def leds(self) -> Array:
+        return self._leds
+
+    @property
+    def progress(self) -> int:
+        """Fixed-point progress of the current transition, up to `ONE`"""
+        with self._lock:
+            return self._progress(perf_counter_ns())
+
+    @property
+    def running(self) -> bool:
+        """Whether the target state has not been written yet"""
+        with self._lock:
+            return self._last is not None
+
+    def to(
+            self,
+            target: Union[bytes, Array],
+            duration: float,
+            easing: str='ease_in_out',
+    ) -> None:
+        """
+        Start a transition to `target`, a packed state (see `Array.dump`) or
+        the state of another array, lasting `duration` seconds
+        """
+        if isinstance(target, Array):
+            target = target.dump()
+        if len(target) != len(self._leds) * LED_SIZE:
+            raise ValueError("The target state does not match the leds")
+        table = easing_table(easing)
+        np = _numpy()
+        now = perf_counter_ns()
+        with self._lock:
+            if self._last is not None:
+                # Retarget from the state reached so far
+                start = self._value(self._progress(now))
+            else:
+                start = self._leds.dump()
+            if np is None:
+                self._start = start
+                self._delta = [b - a for a, b in zip(start, target)]
+            else:
+                self._start = np.frombuffer(start, dtype=np.uint8).astype(
+                    np.int32)
+                self._delta = np.frombuffer(
+                    bytes(target), dtype=np.uint8).astype(np.int32) - \
+                    self._start
+            self._begin = now
+            self._duration = int(duration * 1e9)
+            self._table = table
+            self._last = b''
+
+    def step(self) -> bool:
+        """Write the state for the current time, returns whether running"""
+        with self._lock:
+            if self._last is None:
+                return False
+            progress = self._progress(perf_counter_ns())
+            state = self._value(progress)
+            if state != self._last:
+                self._leds.load(state)
+                self._last = state
+            if progress == ONE:
+                # The target state was written, nothing else to do
+                self._last = None
+            return self._last is not None
+
+    def _progress(self, now: int) -> int:
+        # Must be called with the lock held
+        if self._duration <= 0:
+            return ONE
+        return min(ONE, (now - self._begin) * ONE // self._duration)
+
+    def _value(self, progress: int) -> bytes:
+        # Must be called with the lock held
+        table = self._table
+        index = progress >> _INDEX_SHIFT
+        if index == TABLE_SIZE:
+            weight = table[TABLE_SIZE]
+        else:
+            # Linear interpolation between the samples of the table
+            low = table[index]
+            fraction = progress - (index << _INDEX_SHIFT)
+            weight = low + ((table[index + 1] - low) * fraction >>
+                            _INDEX_SHIFT)
+        if isinstance(self._delta, list):
+            return bytes(a + (d * weight >> FRACTION_BITS)
+                         for a, d in zip(self._start, self._delta))
+        return (self._start + (self._delta * weight >> FRACTION_BITS)).astype(
+            'uint8').tobytes()
@@ -0,0 +1,50 @@
+"""
+MIT License
+
+Copyright (c) 2018 Adrián
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+class Transport:
+    """
+    Link between a board and the physical leds
+
+    Transports receive complete encoded frames and are responsible of
+    delivering them to the led chain. `open` is called when the board is set
+    up and `close` when it is released.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def create(cls, num_leds: int) -> "Transport":
+        """Transport with its default settings for a chain of `num_leds`"""
+        return cls()
+
+    def open(self) -> None:
+        """Acquire the resources needed to send frames"""
+
+    def close(self) -> None:
+        """Release the resources acquired by `open`"""
+
+    def write(self, frame: bytes) -> None:
+        """Send a complete encoded frame"""
+        raise NotImplementedError
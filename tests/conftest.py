@@ -0,0 +1,52 @@
+"""
+Test configuration
+
+The sources live in `src` and are imported as the `blinkt` package.
+"""
+import importlib.util
+import itertools
+import os
+import subprocess
+import sys
+
+import pytest
+
+SOURCES = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src')
+
+if 'blinkt' not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        'blinkt', os.path.join(SOURCES, '__init__.py'),
+        submodule_search_locations=[SOURCES])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['blinkt'] = module
+    spec.loader.exec_module(module)
+
+from blinkt import Board, EmulatorTransport  # noqa: E402
+
+# Boards are kept by name, every test gets new ones
+_names = itertools.count()
+
+
+@pytest.fixture
+def make_board():
+    """Factory of unused boards driving a strict emulated chain"""
+    def make(num_leds=8, transport=None):
+        board = Board('test-{}'.format(next(_names)))
+        board.num_leds = num_leds
+        board.transport = (EmulatorTransport(num_leds, strict=True)
+                           if transport is None else transport)
+        return board
+    return make
+
+
+@pytest.fixture
+def run_script(tmp_path):
+    """Runs a script in a new interpreter that imports the sources"""
+    os.symlink(SOURCES, str(tmp_path / 'blinkt'))
+
+    def run(script):
+        return subprocess.run(
+            [sys.executable, '-c', script], cwd=str(tmp_path),
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True, timeout=30)
+    return run
@@ -0,0 +1,192 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from blinkt import Color, EmulatorTransport
+from blinkt.encoder import LED_FRAME_SIZE, START_FRAME_SIZE, end_frame_size
+
+NUM_LEDS = 8
+TIMEOUT = 5
+
+
+class GatedTransport(EmulatorTransport):
+    """Emulated chain whose writes wait for `gate`, failing `failures` times"""
+
+    __slots__ = ('entered', 'gate', 'failures', 'sizes')
+
+    def __init__(self, num_leds, failures=0):
+        super().__init__(num_leds, strict=True)
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+        self.failures = failures
+        self.sizes = []
+
+    def write(self, frame):
+        self.entered.set()
+        assert self.gate.wait(TIMEOUT)
+        if self.failures:
+            self.failures -= 1
+            raise OSError("Transfer failed")
+        self.sizes.append(len(frame))
+        super().write(frame)
+
+    def latched(self, i):
+        c = _color(i)
+        return self.chain.leds[i][1:] == (c.b, c.g, c.r)
+
+
+def _color(i):
+    return Color(i + 1, 2 * i + 1, 3 * i + 1)
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+class Caller(threading.Thread):
+    """Sets its led, displays, and checks that the led was latched"""
+
+    def __init__(self, board, transport, index, force=False):
+        super().__init__()
+        self.board = board
+        self.transport = transport
+        self.index = index
+        self.force = force
+        self.error = None
+        self.latched = None
+
+    def run(self):
+        self.board.leds[self.index].color = _color(self.index)
+        try:
+            self.board.display(self.force)
+        except Exception as error:
+            self.error = error
+        else:
+            self.latched = self.transport.latched(self.index)
+
+
+@pytest.fixture
+def coalesced(make_board):
+    """Factory of coalescing boards and their gated transports"""
+    def make(failures=0):
+        # The transport is used directly, as the board property waits for
+        # transfers in progress
+        transport = GatedTransport(NUM_LEDS, failures)
+        board = make_board(NUM_LEDS, transport)
+        board.coalesce = True
+        return board, transport
+    return make
+
+
+def _run(board, transport, first, *callers):
+    """Start a transfer and callers that arrive while it is in progress"""
+    requested = board._requested + len(callers) + 1
+    first.start()
+    assert transport.entered.wait(TIMEOUT)
+    for caller in callers:
+        caller.start()
+    # Every caller took its ticket
+    _wait_for(lambda: board._requested == requested)
+    transport.gate.set()
+    for caller in (first,) + callers:
+        caller.join(TIMEOUT)
+        assert not caller.is_alive()
+
+
+def _frame_size(num_leds):
+    return (START_FRAME_SIZE + num_leds * LED_FRAME_SIZE +
+            end_frame_size(num_leds))
+
+
+def test_merged(coalesced):
+    board, transport = coalesced()
+    with board:
+        first = Caller(board, transport, 0)
+        callers = tuple(Caller(board, transport, i)
+                        for i in range(1, NUM_LEDS))
+        _run(board, transport, first, *callers)
+        # Every caller returned once its led was latched
+        for caller in (first,) + callers:
+            assert caller.error is None and caller.latched
+        # A single follow-up transfer served every caller
+        assert transport.frames == 2
+        assert board.merged_requests == len(callers)
+
+
+def test_not_coalesced(coalesced):
+    board, transport = coalesced()
+    board.coalesce = False
+    transport.gate.set()
+    with board:
+        for i in range(3):
+            caller = Caller(board, transport, i)
+            caller.run()
+            assert caller.latched
+        assert transport.frames == 3
+        assert board.merged_requests == 0
+
+
+def test_failed_transfer(coalesced):
+    board, transport = coalesced(failures=1)
+    with board:
+        first = Caller(board, transport, 0)
+        callers = (Caller(board, transport, 1), Caller(board, transport, 2))
+        _run(board, transport, first, *callers)
+        assert isinstance(first.error, OSError)
+        # A waiting caller took over and transmitted for both
+        for caller in callers:
+            assert caller.error is None and caller.latched
+        assert transport.latched(0)
+        assert transport.frames == 1
+        assert board.merged_requests == 1
+
+
+def test_failed_forced_transfer(coalesced):
+    board, transport = coalesced()
+    transport.gate.set()
+    with board:
+        for i in range(NUM_LEDS):
+            board.leds[i].color = _color(i)
+        board.display()
+        transport.gate.clear()
+        transport.entered.clear()
+        transport.failures = 1
+
+        # Nothing changed, only forced transfers send anything
+        first = Caller(board, transport, 0, force=True)
+        caller = Caller(board, transport, 1)
+        _run(board, transport, first, caller)
+        assert isinstance(first.error, OSError)
+        assert caller.error is None and caller.latched
+        # The caller took over the forced transfer
+        assert transport.sizes == [_frame_size(NUM_LEDS)] * 2
+
+
+def test_async(coalesced):
+    board, transport = coalesced()
+
+    async def call(i):
+        board.leds[i].color = _color(i)
+        await board.display_async()
+        return transport.latched(i)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        first = asyncio.ensure_future(call(0))
+        assert await loop.run_in_executor(
+            None, transport.entered.wait, TIMEOUT)
+        callers = [asyncio.ensure_future(call(i)) for i in range(1, NUM_LEDS)]
+        # Let every caller request its display
+        await asyncio.sleep(0)
+        transport.gate.set()
+        return await asyncio.gather(first, *callers)
+
+    with board:
+        assert all(asyncio.run(main()))
+        # The calls made during the first transfer shared the next one
+        assert transport.frames == 2
@@ -0,0 +1,125 @@
+import pytest
+
+from blinkt import (
+    Calibrated, Color, Correction, EmulatedGPIO, EmulatorTransport,
+    GPIOTransport, NoDelay)
+from blinkt.encoder import LED_FRAME_SIZE, START_FRAME_SIZE, end_frame_size
+
+SIZES = (1, 2, 7, 144, 1001)
+
+
+class CountingTransport(EmulatorTransport):
+    """Emulated chain that keeps the length of every frame"""
+
+    __slots__ = ('sizes',)
+
+    def __init__(self, num_leds):
+        super().__init__(num_leds, strict=True)
+        self.sizes = []
+
+    def write(self, frame):
+        self.sizes.append(len(frame))
+        super().write(frame)
+
+
+def _frame_size(num_leds):
+    return (START_FRAME_SIZE + num_leds * LED_FRAME_SIZE +
+            end_frame_size(num_leds))
+
+
+def _expected(board):
+    state = board.leds.dump()
+    return tuple(tuple(state[i:i + LED_FRAME_SIZE])
+                 for i in range(0, len(state), LED_FRAME_SIZE))
+
+
+def _paint(board, offset=0):
+    board.leds.color = [Color(i + offset, 2 * i, 255 - i)
+                        for i in range(256)]
+    board.leds.brightness = [i / 31 for i in range(32)]
+
+
+@pytest.mark.parametrize('num_leds', SIZES)
+def test_display(make_board, num_leds):
+    board = make_board(num_leds)
+    with board:
+        _paint(board)
+        board.display()
+        assert board.transport.chain.leds == _expected(board)
+        assert board.transport.chain.errors == []
+
+
+def test_truncated(make_board):
+    transport = CountingTransport(8)
+    board = make_board(8, transport)
+    with board:
+        _paint(board)
+        board.display()
+        board.leds[2].color = Color(9, 9, 9)
+        board.display()
+        assert transport.chain.leds == _expected(board)
+    assert transport.sizes[:2] == [_frame_size(8), _frame_size(3)]
+    assert board.truncated_frames == 1
+
+
+def test_skipped(make_board):
+    transport = CountingTransport(8)
+    board = make_board(8, transport)
+    with board:
+        _paint(board)
+        board.display()
+        board.display()
+        # Setting the values leds already have sends nothing either
+        board.leds[0].color = board.leds[0].color
+        board.display()
+        board.display(force=True)
+    assert transport.sizes[:2] == [_frame_size(8), _frame_size(8)]
+    assert board.skipped_frames == 2
+
+
+def test_correction(make_board):
+    board = make_board(8)
+    correction = Correction(gamma=(2.2, 1.8, 2.0), white_point=(1.0, 0.5, 0.8),
+                            max_brightness=0.5)
+    board.correction = correction
+    with board:
+        _paint(board)
+        board.display()
+        headers, blue, green, red = correction.tables
+        expected = tuple(
+            (headers[brightness] & 0x1F, blue[b], green[g], red[r])
+            for brightness, b, g, r in _expected(board))
+        assert board.transport.chain.leds == expected
+
+
+@pytest.mark.parametrize('timing', [NoDelay(), Calibrated(1e6)],
+                         ids=str)
+def test_gpio(make_board, timing):
+    gpio = EmulatedGPIO(8)
+    board = make_board(8, GPIOTransport(timing=timing, gpio=gpio))
+    with board:
+        _paint(board)
+        board.display()
+        gpio.chain.end()
+        assert gpio.chain.leds == _expected(board)
+        _paint(board, 1)
+        board.display()
+        gpio.chain.end()
+        assert gpio.chain.leds == _expected(board)
+    assert gpio.chain.errors == []
+
+
+def test_display_without_numpy(run_script):
+    result = run_script(
+        "import sys\n"
+        "from blinkt import Board, Color, EmulatorTransport\n"
+        "board = Board()\n"
+        "board.transport = EmulatorTransport()\n"
+        "with board:\n"
+        "    for i in range(3):\n"
+        "        board.leds[i].color = Color(i, i, i)\n"
+        "        board.display()\n"
+        "print('numpy' in sys.modules)\n"
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == 'False'
@@ -0,0 +1,69 @@
+import pytest
+
+from blinkt.emulator import Chain
+from blinkt.encoder import (
+    Encoder, LED_FRAME_SIZE, LED_HEADER, START_FRAME_SIZE, end_frame_size,
+    wrap)
+
+SIZES = (1, 2, 7, 144, 1001)
+
+
+def _state(num_leds):
+    """Packed state with a different value on every byte of every led"""
+    return bytes((i * LED_FRAME_SIZE + byte) % 256 if byte else i % 32
+                 for i in range(num_leds) for byte in range(LED_FRAME_SIZE))
+
+
+def _leds(state):
+    return tuple(tuple(state[i:i + LED_FRAME_SIZE])
+                 for i in range(0, len(state), LED_FRAME_SIZE))
+
+
+@pytest.mark.parametrize('num_leds, size', [
+    (1, 1), (2, 1), (7, 1), (144, 9), (1001, 63)])
+def test_end_frame_size(num_leds, size):
+    assert end_frame_size(num_leds) == size
+
+
+@pytest.mark.parametrize('num_leds', SIZES)
+def test_round_trip(num_leds):
+    state = _state(num_leds)
+    frame = Encoder().encode_state(state)
+    assert len(frame) == (START_FRAME_SIZE + num_leds * LED_FRAME_SIZE +
+                          end_frame_size(num_leds))
+    assert frame[:START_FRAME_SIZE] == bytes(START_FRAME_SIZE)
+
+    chain = Chain(num_leds)
+    chain.feed(frame)
+    chain.end()
+    assert chain.errors == []
+    assert chain.latched == num_leds
+    assert chain.leds == _leds(state)
+
+
+@pytest.mark.parametrize('num_leds', SIZES)
+def test_short_end_frame(num_leds):
+    frame = Encoder().encode_state(_state(num_leds))
+    chain = Chain(num_leds)
+    chain.feed(frame[:-end_frame_size(num_leds)])
+    chain.end()
+    assert chain.errors
+    assert chain.leds[-1] == (0, 0, 0, 0)
+
+
+def test_headers():
+    leds = Encoder().encode_leds(bytes([31, 1, 2, 3, 255, 4, 5, 6]))
+    assert leds == bytes([LED_HEADER | 31, 1, 2, 3, LED_HEADER | 31, 4, 5, 6])
+
+
+def test_truncated_chain():
+    # A frame for the first leds leaves the rest of the chain untouched
+    state = _state(8)
+    chain = Chain(8)
+    chain.feed(Encoder().encode_state(state))
+    chain.end()
+    update = bytes([1, 2, 3, 4]) * 3
+    chain.feed(wrap(Encoder().encode_leds(update)))
+    chain.end()
+    assert chain.errors == []
+    assert chain.leds == _leds(update) + _leds(state)[3:]
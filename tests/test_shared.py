@@ -0,0 +1,111 @@
+import multiprocessing
+
+import pytest
+
+from blinkt import Color
+from blinkt.leds import Array
+
+pytest.importorskip('numpy')
+
+if 'fork' not in multiprocessing.get_all_start_methods():
+    pytest.skip("Forking is needed to share the test package",
+                allow_module_level=True)
+
+_fork = multiprocessing.get_context('fork')
+
+
+def _setters(name):
+    leds = Array.attach(name)
+    leds[0].color = Color(1, 2, 3)
+    leds[1].brightness = 0.0
+    leds.close()
+
+
+def _vectorized(name):
+    leds = Array.attach(name)
+    with leds.vectorized() as (color, brightness):
+        color[0] = (4, 5, 6)
+        brightness[1] = 0
+    del color, brightness
+    leds.close()
+
+
+def _views(name):
+    leds = Array.attach(name)
+    leds.color_view[0] = (7, 8, 9)
+    leds.brightness_view[1] = 0
+    leds.close()
+
+
+def _run(target, name):
+    process = _fork.Process(target=target, args=(name,))
+    process.start()
+    process.join(10)
+    assert process.exitcode == 0
+
+
+@pytest.fixture
+def board(make_board):
+    board = make_board(4)
+    board.share()
+    yield board
+    board.leds.close()
+
+
+@pytest.mark.parametrize('target, color', [
+    (_setters, (1, 2, 3)), (_vectorized, (4, 5, 6)), (_views, (7, 8, 9))],
+    ids=['setters', 'vectorized', 'views'])
+def test_other_process(board, target, color):
+    with board:
+        board.display(force=True)
+        _run(target, board.leds.name)
+        board.display()
+        r, g, b = color
+        assert board.transport.chain.leds[:2] == ((15, b, g, r), (0, 0, 0, 0))
+
+
+def test_own_views(board):
+    with board:
+        board.display(force=True)
+        board.leds.color_view[0] = (9, 9, 9)
+        board.display()
+        assert board.transport.chain.leds[0] == (15, 9, 9, 9)
+        board.leds.brightness_view[0] = 3
+        board.display()
+        assert board.transport.chain.leds[0] == (3, 9, 9, 9)
+
+
+def test_share_keeps_state(make_board):
+    board = make_board(4)
+    board.leds[0].color = Color(10, 20, 30)
+    board.leds[1].brightness = 0.0
+    state = board.leds.dump()
+    board.share()
+    try:
+        assert board.leds.dump() == state
+    finally:
+        board.leds.close()
+
+
+def test_close_with_views(board):
+    view = board.leds.color_view[1:]
+    with pytest.raises(BufferError):
+        board.leds.close()
+    board.leds[0].color = Color(1, 2, 3)
+    other = Array.attach(board.leds.name)
+    assert other[0].color.r == 1
+    other.close()
+    del view
+
+
+def test_removed_at_exit(run_script):
+    result = run_script(
+        "from blinkt import Board\n"
+        "board = Board()\n"
+        "print(board.share())\n"
+        "view = board.leds.color_view\n"
+    )
+    assert result.returncode == 0
+    assert 'leaked' not in result.stderr
+    with pytest.raises(FileNotFoundError):
+        Array.attach(result.stdout.strip())